@@ -7,21 +7,27 @@ if (flask_debug := os.environ.get("FLASK_DEBUG", "0")) and flask_debug.lower() i
     from gevent import monkey
 
     # gevent
-    monkey.patch_all()
+    # the API never spawns child processes, so leave subprocess unpatched
+    monkey.patch_all(subprocess=False)
 
-    from grpc.experimental import gevent as grpc_gevent  # type: ignore
+    try:
+        from grpc.experimental import gevent as grpc_gevent  # type: ignore
+    except ImportError:
+        grpc_gevent = None
 
     # grpc gevent
-    grpc_gevent.init_gevent()
+    if grpc_gevent is not None:
+        grpc_gevent.init_gevent()
 
-    import psycogreen.gevent  # type: ignore
+    # configs can't be imported before patching, so read the scheme straight from the environment
+    if os.environ.get("SQLALCHEMY_DATABASE_URI_SCHEME", "postgresql").startswith("postgresql"):
+        import psycogreen.gevent  # type: ignore
 
-    psycogreen.gevent.patch_psycopg()
+        psycogreen.gevent.patch_psycopg()
 
 from app_factory import create_app
 
 app = create_app()
-celery = app.extensions["celery"]
 
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5011)
@@ -1,10 +1,21 @@
+import importlib
 import logging
+import os
 import time
+from collections.abc import Callable
 
 from configs import dify_config
 from contexts.wrapper import RecyclableContextVar
 from dify_app import DifyApp
 
+# Enable flags that can be read from config before the extension module is imported
+EXTENSION_ENABLED_CHECKS: dict[str, Callable[[], bool]] = {
+    "ext_compress": lambda: dify_config.API_COMPRESSION_ENABLED,
+    # web workers only serve requests and never need celery's import tree
+    "ext_celery": lambda: os.environ.get("MODE") != "api",
+    "ext_request_logging": lambda: dify_config.ENABLE_REQUEST_LOGGING,
+}
+
 
 # ----------------------------
 # Application Factory Function
@@ -37,44 +48,35 @@ def create_app() -> DifyApp:
 
 
 def initialize_extensions(app: DifyApp):
-    from extensions import (
-        ext_app_metrics,
-        ext_blueprints,
-        ext_celery,
-        ext_compress,
-        ext_database,
-        ext_logging,
-        ext_login,
-        ext_redis,
-        ext_request_logging,
-        ext_storage,
-        ext_timezone,
-        ext_warnings,
-    )
-
+    # Extensions are imported by name so that a disabled one never pulls in its dependencies.
     extensions = [
-        ext_timezone,
-        ext_logging,
-        ext_warnings,
-        ext_compress,
-        ext_database,
-        ext_app_metrics,
-        ext_redis,
-        ext_storage,
-        ext_login,
-        ext_celery,
-        ext_blueprints,
-        ext_request_logging,
+        "extensions.ext_timezone",
+        "extensions.ext_logging",
+        "extensions.ext_warnings",
+        "extensions.ext_compress",
+        "extensions.ext_database",
+        "extensions.ext_app_metrics",
+        "extensions.ext_redis",
+        "extensions.ext_storage",
+        "extensions.ext_login",
+        "extensions.ext_celery",
+        "extensions.ext_blueprints",
+        "extensions.ext_request_logging",
     ]
-    for ext in extensions:
-        short_name = ext.__name__.split(".")[-1]
-        is_enabled = ext.is_enabled() if hasattr(ext, "is_enabled") else True
+    for module_name in extensions:
+        short_name = module_name.split(".")[-1]
+        is_enabled = EXTENSION_ENABLED_CHECKS[short_name]() if short_name in EXTENSION_ENABLED_CHECKS else True
         if not is_enabled:
             if dify_config.DEBUG:
                 logging.info(f"Skipped {short_name}")
             continue
 
         start_time = time.perf_counter()
+        ext = importlib.import_module(module_name)
+        if hasattr(ext, "is_enabled") and not ext.is_enabled():
+            if dify_config.DEBUG:
+                logging.info(f"Skipped {short_name}")
+            continue
         ext.init_app(app)
         end_time = time.perf_counter()
         if dify_config.DEBUG:
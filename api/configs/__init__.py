@@ -1,3 +1,3 @@
-from .app_config import DifyConfig
+from .app_config import DifyConfig, get_dify_config
 
-dify_config = DifyConfig()
+dify_config = get_dify_config()
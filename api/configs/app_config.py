@@ -1,4 +1,5 @@
 import logging
+from functools import lru_cache
 
 from pydantic_settings import BaseSettings, PydanticBaseSettingsSource, SettingsConfigDict
 
@@ -23,6 +24,8 @@ class DifyConfig(
         env_file_encoding="utf-8",
         # ignore extra attributes
         extra="ignore",
+        # settings are built once per process (see get_dify_config) and must not drift afterwards
+        frozen=True,
     )
 
     # Before adding any config,
@@ -45,3 +48,11 @@ class DifyConfig(
             dotenv_settings,
             file_secret_settings,
         )
+
+
+@lru_cache(maxsize=1)
+def get_dify_config() -> DifyConfig:
+    """
+    Build the settings once per process; `.env` and environment parsing is not repeated on later calls.
+    """
+    return DifyConfig()
@@ -1,3 +1,5 @@
+import re
+from functools import cached_property
 from typing import Annotated, Optional
 
 from pydantic import (
@@ -121,9 +123,10 @@ class HttpConfig(BaseSettings):
         default="",
     )
 
-    @computed_field
-    def CONSOLE_CORS_ALLOW_ORIGINS(self) -> list[str]:
-        return self.inner_CONSOLE_CORS_ALLOW_ORIGINS.split(",")
+    @computed_field  # type: ignore[misc]
+    @cached_property
+    def CONSOLE_CORS_ALLOW_ORIGINS(self) -> tuple[str, ...]:
+        return tuple(origin.strip() for origin in self.inner_CONSOLE_CORS_ALLOW_ORIGINS.split(","))
 
     inner_WEB_API_CORS_ALLOW_ORIGINS: str = Field(
         description="",
@@ -131,9 +134,10 @@ class HttpConfig(BaseSettings):
         default="*",
     )
 
-    @computed_field
-    def WEB_API_CORS_ALLOW_ORIGINS(self) -> list[str]:
-        return self.inner_WEB_API_CORS_ALLOW_ORIGINS.split(",")
+    @computed_field  # type: ignore[misc]
+    @cached_property
+    def WEB_API_CORS_ALLOW_ORIGINS(self) -> tuple[str, ...]:
+        return tuple(origin.strip() for origin in self.inner_WEB_API_CORS_ALLOW_ORIGINS.split(","))
 
     HTTP_REQUEST_MAX_CONNECT_TIMEOUT: Annotated[
         PositiveInt, Field(ge=10, description="Maximum connection timeout in seconds for HTTP requests")
@@ -273,6 +277,14 @@ class CeleryBeatConfig(BaseSettings):
     )
 
 
+_COMMA_SEPARATOR = re.compile(r"\s*,\s*")
+
+
+def _split_comma_separated(value: str) -> list[str]:
+    """Split a comma-separated setting into its non-empty, whitespace-trimmed items."""
+    return [item for item in _COMMA_SEPARATOR.split(value.strip()) if item]
+
+
 class PositionConfig(BaseSettings):
     POSITION_PROVIDER_PINS: str = Field(
         description="Comma-separated list of pinned model providers",
@@ -304,29 +316,29 @@ class PositionConfig(BaseSettings):
         default="",
     )
 
-    @property
+    @cached_property
     def POSITION_PROVIDER_PINS_LIST(self) -> list[str]:
-        return [item.strip() for item in self.POSITION_PROVIDER_PINS.split(",") if item.strip() != ""]
+        return _split_comma_separated(self.POSITION_PROVIDER_PINS)
 
-    @property
-    def POSITION_PROVIDER_INCLUDES_SET(self) -> set[str]:
-        return {item.strip() for item in self.POSITION_PROVIDER_INCLUDES.split(",") if item.strip() != ""}
+    @cached_property
+    def POSITION_PROVIDER_INCLUDES_SET(self) -> frozenset[str]:
+        return frozenset(_split_comma_separated(self.POSITION_PROVIDER_INCLUDES))
 
-    @property
-    def POSITION_PROVIDER_EXCLUDES_SET(self) -> set[str]:
-        return {item.strip() for item in self.POSITION_PROVIDER_EXCLUDES.split(",") if item.strip() != ""}
+    @cached_property
+    def POSITION_PROVIDER_EXCLUDES_SET(self) -> frozenset[str]:
+        return frozenset(_split_comma_separated(self.POSITION_PROVIDER_EXCLUDES))
 
-    @property
+    @cached_property
     def POSITION_TOOL_PINS_LIST(self) -> list[str]:
-        return [item.strip() for item in self.POSITION_TOOL_PINS.split(",") if item.strip() != ""]
+        return _split_comma_separated(self.POSITION_TOOL_PINS)
 
-    @property
-    def POSITION_TOOL_INCLUDES_SET(self) -> set[str]:
-        return {item.strip() for item in self.POSITION_TOOL_INCLUDES.split(",") if item.strip() != ""}
+    @cached_property
+    def POSITION_TOOL_INCLUDES_SET(self) -> frozenset[str]:
+        return frozenset(_split_comma_separated(self.POSITION_TOOL_INCLUDES))
 
-    @property
-    def POSITION_TOOL_EXCLUDES_SET(self) -> set[str]:
-        return {item.strip() for item in self.POSITION_TOOL_EXCLUDES.split(",") if item.strip() != ""}
+    @cached_property
+    def POSITION_TOOL_EXCLUDES_SET(self) -> frozenset[str]:
+        return frozenset(_split_comma_separated(self.POSITION_TOOL_EXCLUDES))
 
 
 class FeatureConfig(
@@ -84,6 +84,30 @@ class VectorStoreConfig(BaseSettings):
         default=False,
     )
 
+    VECTOR_SEARCH_CACHE_ENABLED: bool = Field(
+        description="Cache vector search results in process memory, serving repeated and near-identical queries"
+        " without a round trip to the vector store.",
+        default=False,
+    )
+
+    VECTOR_SEARCH_CACHE_MAX_SIZE: PositiveInt = Field(
+        description="Maximum number of search results kept in the vector search cache.",
+        default=4096,
+    )
+
+    VECTOR_SEARCH_CACHE_TTL: PositiveFloat = Field(
+        description="Seconds a cached vector search result stays valid.",
+        default=60.0,
+    )
+
+    VECTOR_SEARCH_CACHE_SIMILARITY_THRESHOLD: float = Field(
+        description="Minimum cosine similarity between query embeddings for a cached result to be reused"
+        " for a different query text.",
+        default=0.97,
+        ge=0.0,
+        le=1.0,
+    )
+
 
 class KeywordStoreConfig(BaseSettings):
     KEYWORD_STORE: str = Field(
@@ -166,11 +190,32 @@ class DatabaseConfig(BaseSettings):
         default=False,
     )
 
+    SQLALCHEMY_POOL_USE_LIFO: bool = Field(
+        description="If True, reuse the most recently returned connection first, keeping a small set of warm"
+        " connections busy and letting the rest idle out.",
+        default=True,
+    )
+
     SQLALCHEMY_ECHO: bool | str = Field(
         description="If True, SQLAlchemy will log all SQL statements.",
         default=False,
     )
 
+    SQLALCHEMY_QUERY_CACHE_SIZE: NonNegativeInt = Field(
+        description="Size of SQLAlchemy's compiled statement cache per engine; 0 disables statement caching.",
+        default=2000,
+    )
+
+    SQLALCHEMY_INSERTMANYVALUES_PAGE_SIZE: PositiveInt = Field(
+        description="Maximum number of rows SQLAlchemy folds into one multi-row INSERT for executemany inserts.",
+        default=1000,
+    )
+
+    SQLALCHEMY_EXECUTEMANY_BATCH_PAGE_SIZE: PositiveInt = Field(
+        description="Number of parameter sets psycopg2 sends per round trip for executemany UPDATE and DELETE.",
+        default=500,
+    )
+
     RETRIEVAL_SERVICE_EXECUTORS: NonNegativeInt = Field(
         description="Number of processes for the retrieval service, default to CPU cores.",
         default=os.cpu_count() or 1,
@@ -192,13 +237,23 @@ class DatabaseConfig(BaseSettings):
 
         connect_args = {"options": merged_options}
 
-        return {
+        engine_options: dict[str, Any] = {
             "pool_size": self.SQLALCHEMY_POOL_SIZE,
             "max_overflow": self.SQLALCHEMY_MAX_OVERFLOW,
             "pool_recycle": self.SQLALCHEMY_POOL_RECYCLE,
             "pool_pre_ping": self.SQLALCHEMY_POOL_PRE_PING,
+            "pool_use_lifo": self.SQLALCHEMY_POOL_USE_LIFO,
+            "query_cache_size": self.SQLALCHEMY_QUERY_CACHE_SIZE,
+            "insertmanyvalues_page_size": self.SQLALCHEMY_INSERTMANYVALUES_PAGE_SIZE,
             "connect_args": connect_args,
         }
+        # psycopg2-only dialect arguments; other drivers reject them
+        if self.SQLALCHEMY_DATABASE_URI_SCHEME in {"postgresql", "postgresql+psycopg2"}:
+            # also batch executemany UPDATE/DELETE into execute_batch() pages instead of one round trip per row
+            engine_options["executemany_mode"] = "values_plus_batch"
+            engine_options["executemany_batch_page_size"] = self.SQLALCHEMY_EXECUTEMANY_BATCH_PAGE_SIZE
+
+        return engine_options
 
 
 class CeleryConfig(DatabaseConfig):
@@ -40,6 +40,12 @@ class MilvusConfig(BaseSettings):
         default=True,
     )
 
+    MILVUS_PARALLEL_HYBRID_SEARCH: bool = Field(
+        description="Run the dense and BM25 searches of a hybrid search as two concurrent requests and fuse them"
+        " client-side instead of issuing a single hybrid_search call.",
+        default=False,
+    )
+
     MILVUS_ANALYZER_PARAMS: Optional[str] = Field(
         description='Milvus text analyzer parameters, e.g., {"type": "chinese"} for Chinese segmentation support.',
         default=None,
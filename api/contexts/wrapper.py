@@ -23,11 +23,8 @@ class RecyclableContextVar(Generic[T]):
 
     @classmethod
     def increment_thread_recycles(cls):
-        try:
-            recycles = cls._thread_recycles.get()
-            cls._thread_recycles.set(recycles + 1)
-        except LookupError:
-            cls._thread_recycles.set(0)
+        # the first call per context starts at 0, without raising and catching LookupError
+        cls._thread_recycles.set(cls._thread_recycles.get(-1) + 1)
 
     def __init__(self, context_var: ContextVar[T]):
         self._context_var = context_var
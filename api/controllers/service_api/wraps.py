@@ -1,4 +1,5 @@
-from datetime import UTC, datetime, timedelta
+import hashlib
+import json
 from enum import Enum
 from functools import wraps
 
@@ -6,14 +7,33 @@ from flask import current_app, request
 from flask_login import user_logged_in  # type: ignore
 from flask_restful import Resource
 from pydantic import BaseModel
-from sqlalchemy import select, update
+from sqlalchemy import and_, bindparam, select
 from sqlalchemy.orm import Session
 from werkzeug.exceptions import Unauthorized
 
 from extensions.ext_database import db
-from models.account import Account, Tenant, TenantAccountJoin, TenantStatus
+from extensions.ext_redis import redis_client
+from models.account import Account, Tenant, TenantAccountJoin, TenantAccountRole, TenantStatus
 from models.model import ApiToken
 
+# seconds a validated token is served from Redis; a revoked token stays usable for at most this long
+API_TOKEN_CACHE_TTL = 60
+
+# Hot-path statements are built once; each request only binds parameters, and the compiled form
+# is served from the engine's compiled cache.
+_API_TOKEN_STMT = select(ApiToken).where(ApiToken.token == bindparam("token"), ApiToken.type == bindparam("scope"))
+
+# only owner information is required, so only one is returned.
+_TENANT_OWNER_STMT = (
+    select(Tenant, Account)
+    .join(
+        TenantAccountJoin,
+        and_(TenantAccountJoin.tenant_id == Tenant.id, TenantAccountJoin.role == "owner"),
+    )
+    .outerjoin(Account, Account.id == TenantAccountJoin.account_id)
+    .where(Tenant.id == bindparam("tenant_id"), Tenant.status == TenantStatus.NORMAL)
+)
+
 
 class WhereisUserArg(Enum):
     """
@@ -34,27 +54,21 @@ def validate_dataset_token(view=None):
     def decorator(view):
         @wraps(view)
         def decorated(*args, **kwargs):
-            api_token = validate_and_get_api_token("dataset")
-            tenant_account_join = (
-                db.session.query(Tenant, TenantAccountJoin)
-                .filter(Tenant.id == api_token.tenant_id)
-                .filter(TenantAccountJoin.tenant_id == Tenant.id)
-                .filter(TenantAccountJoin.role.in_(["owner"]))
-                .filter(Tenant.status == TenantStatus.NORMAL)
-                .one_or_none()
-            )  # TODO: only owner information is required, so only one is returned.
-            if tenant_account_join:
-                tenant, ta = tenant_account_join
-                account = db.session.query(Account).filter(Account.id == ta.account_id).first()
-                # Login admin
-                if account:
-                    account.current_tenant = tenant
-                    current_app.login_manager._update_request_context_with_user(account)  # type: ignore
-                    user_logged_in.send(current_app._get_current_object(), user=account)  # type: ignore
-                else:
-                    raise Unauthorized("Tenant owner account does not exist.")
-            else:
+            # one read-only session (and one pooled connection) covers the whole auth check
+            with Session(db.engine, expire_on_commit=False, autoflush=False) as session:
+                api_token = validate_and_get_api_token("dataset", session=session)
+                tenant_account = session.execute(_TENANT_OWNER_STMT, {"tenant_id": api_token.tenant_id}).first()
+            if not tenant_account:
                 raise Unauthorized("Tenant does not exist.")
+            tenant, account = tenant_account
+            if not account:
+                raise Unauthorized("Tenant owner account does not exist.")
+            # Login admin; the owner join already proved the role, so skip the membership lookup in the
+            # current_tenant setter, which would check out a second connection through db.session
+            account.role = TenantAccountRole.OWNER
+            account._current_tenant = tenant
+            current_app.login_manager._update_request_context_with_user(account)  # type: ignore
+            user_logged_in.send(current_app._get_current_object(), user=account)  # type: ignore
             return view(api_token.tenant_id, *args, **kwargs)
 
         return decorated
@@ -67,46 +81,61 @@ def validate_dataset_token(view=None):
     return decorator
 
 
-def validate_and_get_api_token(scope: str | None = None):
+def validate_and_get_api_token(scope: str | None = None, session: Session | None = None):
     """
     Validate and get API token.
+    Reuses `session` when the caller already holds one, otherwise a short-lived session is opened.
     """
     auth_header = request.headers.get("Authorization")
-    if auth_header is None or " " not in auth_header:
+    if not auth_header:
         raise Unauthorized("Authorization header must be provided and start with 'Bearer'")
 
-    auth_scheme, auth_token = auth_header.split(None, 1)
-    auth_scheme = auth_scheme.lower()
-
-    if auth_scheme != "bearer":
+    # compare the fixed-width scheme prefix instead of splitting the whole header
+    if auth_header[:7].lower() != "bearer ":
         raise Unauthorized("Authorization scheme must be 'Bearer'")
 
-    current_time = datetime.now(UTC).replace(tzinfo=None)
-    cutoff_time = current_time - timedelta(minutes=1)
-    with Session(db.engine, expire_on_commit=False) as session:
-        # update_stmt = (
-        #     update(ApiToken)
-        #     .where(
-        #         ApiToken.token == auth_token,
-        #         (ApiToken.last_used_at.is_(None) | (ApiToken.last_used_at < cutoff_time)),
-        #         ApiToken.type == scope,
-        #     )
-        #     .values(last_used_at=current_time)
-        #     .returning(ApiToken)
-        # )
-        # result = session.execute(update_stmt)
-        # api_token = result.scalar_one_or_none()
-        api_token = None
-        if not api_token:
-            stmt = select(ApiToken).where(ApiToken.token == auth_token, ApiToken.type == scope)
-            api_token = session.scalar(stmt)
-            if not api_token:
-                raise Unauthorized("Access token is invalid")
-        else:
-            session.commit()
+    auth_token = auth_header[7:].strip()
+    if not auth_token:
+        raise Unauthorized("Access token is invalid")
+
+    cache_key = _api_token_cache_key(auth_token, scope)
+    cached_api_token = redis_client.get(cache_key)
+    if cached_api_token:
+        return ApiToken(**json.loads(cached_api_token))
+
+    if session is None:
+        with Session(db.engine, expire_on_commit=False) as own_session:
+            api_token = _fetch_api_token(own_session, auth_token, scope)
+    else:
+        api_token = _fetch_api_token(session, auth_token, scope)
+
+    redis_client.setex(
+        cache_key,
+        API_TOKEN_CACHE_TTL,
+        json.dumps(
+            {
+                "id": api_token.id,
+                "app_id": api_token.app_id,
+                "tenant_id": api_token.tenant_id,
+                "type": api_token.type,
+            }
+        ),
+    )
+    return api_token
+
 
+def _fetch_api_token(session: Session, auth_token: str, scope: str | None) -> ApiToken:
+    api_token = session.scalar(_API_TOKEN_STMT, {"token": auth_token, "scope": scope})
+    if not api_token:
+        raise Unauthorized("Access token is invalid")
     return api_token
 
 
+def _api_token_cache_key(auth_token: str, scope: str | None) -> str:
+    # key on the token digest so raw secrets never end up in redis
+    token_hash = hashlib.sha256(auth_token.encode()).hexdigest()
+    return f"api_token:{scope}:{token_hash}"
+
+
 class DatasetApiResource(Resource):
     method_decorators = [validate_dataset_token]
@@ -1,6 +1,6 @@
 import os
 from collections import OrderedDict
-from collections.abc import Callable
+from collections.abc import Callable, Set
 from typing import Any
 
 from configs import dify_config
@@ -73,8 +73,8 @@ def pin_position_map(original_position_map: dict[str, int], pin_list: list[str])
 
 
 def is_filtered(
-    include_set: set[str],
-    exclude_set: set[str],
+    include_set: Set[str],
+    exclude_set: Set[str],
     data: Any,
     name_func: Callable[[Any], str],
 ) -> bool:
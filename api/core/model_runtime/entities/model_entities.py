@@ -110,10 +110,10 @@ class DefaultParameterName(StrEnum):
         :param value: parameter value
         :return: parameter name
         """
-        for name in cls:
-            if name.value == value:
-                return name
-        raise ValueError(f"invalid parameter name {value}")
+        try:
+            return cls(value)
+        except ValueError:
+            raise ValueError(f"invalid parameter name {value}") from None
 
 
 class ParameterType(Enum):
@@ -1,15 +1,37 @@
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+from operator import itemgetter
 from typing import Optional
 
+from flask import Flask, current_app
 from sqlalchemy.orm import load_only
 
 from core.rag.datasource.vdb.vector_factory import Vector
-from core.rag.embedding.retrieval import RetrievalSegments
+from core.rag.embedding.retrieval import RetrievalChildChunk, RetrievalSegments
 from core.rag.index_processor.constant.index_type import IndexType
 from core.rag.models.document import Document
 from extensions.ext_database import db
 from models.dataset import ChildChunk, Dataset, DocumentSegment
 from models.dataset import Document as DatasetDocument
 
+# embeds queries while the caller is still resolving its document filter
+_embedding_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="retrieval_embedding")
+
+# every DocumentSegment column read while formatting retrieval results, loaded up front so
+# DatasetService.format_retrieve_response never triggers a deferred load per segment
+RETRIEVAL_SEGMENT_COLUMNS = (
+    DocumentSegment.id,
+    DocumentSegment.dataset_id,
+    DocumentSegment.index_node_id,
+    DocumentSegment.index_node_hash,
+    DocumentSegment.content,
+    DocumentSegment.answer,
+    DocumentSegment.position,
+    DocumentSegment.word_count,
+    DocumentSegment.hit_count,
+)
+
 
 class RetrievalService:
     # Cache precompiled regular expressions to avoid repeated compilation
@@ -21,7 +43,13 @@ class RetrievalService:
         top_k: int,
         score_threshold: Optional[float] = 0.0,
         document_ids_filter: Optional[list[str]] = None,
+        document_ids_filter_loader: Optional[Callable[[], Optional[list[str]]]] = None,
     ):
+        """
+        Search the dataset's vector store.
+        When document_ids_filter_loader is given it runs on the calling thread while the query is
+        embedded in the background, so the filter lookup and the embedding request overlap.
+        """
         if not query:
             return []
 
@@ -32,9 +60,28 @@ class RetrievalService:
         exceptions: list[str] = []
 
         vector_processor = Vector(dataset=dataset)
+        search_query = cls.escape_query_for_search(query)
+
+        query_vector = None
+        if document_ids_filter_loader is not None:
+            embedding_future = _embedding_executor.submit(
+                cls._embed_query,
+                current_app._get_current_object(),  # type: ignore
+                vector_processor,
+                search_query,
+            )
+            document_ids_filter = document_ids_filter_loader()
+            if document_ids_filter is not None and not document_ids_filter:
+                # no document passes the filter; don't wait for the embedding a search can't use
+                embedding_future.cancel()
+                return []
+            query_vector = embedding_future.result()
+        elif document_ids_filter is not None and not document_ids_filter:
+            return []
 
         documents = vector_processor.search_by_hybrid(
-            cls.escape_query_for_search(query),
+            search_query,
+            query_vector=query_vector,
             top_k=top_k,
             score_threshold=score_threshold,
             document_ids_filter=document_ids_filter,
@@ -47,9 +94,15 @@ class RetrievalService:
 
         return all_documents
 
+    @staticmethod
+    def _embed_query(flask_app: Flask, vector_processor: Vector, query: str) -> list[float]:
+        with flask_app.app_context():
+            return vector_processor.embed_query(query)
+
     @staticmethod
     def escape_query_for_search(query: str) -> str:
-        return query.replace('"', '\\"')
+        # most queries carry no quotes, return them as-is instead of copying
+        return query.replace('"', '\\"') if '"' in query else query
 
     @classmethod
     def format_retrieval_documents(cls, documents: list[Document]) -> list[RetrievalSegments]:
@@ -79,116 +132,120 @@ class RetrievalService:
                 )).all()
             }
 
+            # Batch query child chunks and segments up front instead of once per retrieved document
+            child_index_node_ids = set()
+            index_node_ids = set()
+            for document in documents:
+                dataset_document = dataset_documents.get(document.metadata.get("document_id"))
+                if not dataset_document or not document.metadata.get("doc_id"):
+                    continue
+                if dataset_document.doc_form == IndexType.PARENT_CHILD_INDEX:
+                    child_index_node_ids.add(document.metadata["doc_id"])
+                else:
+                    index_node_ids.add(document.metadata["doc_id"])
+            dataset_ids = {doc.dataset_id for doc in dataset_documents.values()}
+
+            child_chunks: dict[str, ChildChunk] = {}
+            if child_index_node_ids:
+                for child_chunk in db.session.query(ChildChunk).filter(
+                    ChildChunk.index_node_id.in_(child_index_node_ids)
+                ):
+                    child_chunks.setdefault(child_chunk.index_node_id, child_chunk)
+
+            child_segments: dict[str, DocumentSegment] = {}
+            if child_chunks:
+                child_segments = {
+                    segment.id: segment
+                    for segment in db.session.query(DocumentSegment)
+                    .filter(
+                        DocumentSegment.dataset_id.in_(dataset_ids),
+                        DocumentSegment.enabled == True,
+                        DocumentSegment.status == "completed",
+                        DocumentSegment.id.in_({child_chunk.segment_id for child_chunk in child_chunks.values()}),
+                    )
+                    .options(load_only(*RETRIEVAL_SEGMENT_COLUMNS))
+                }
+
+            segments: dict[tuple[str, str], DocumentSegment] = {}
+            if index_node_ids:
+                for segment in (
+                    db.session.query(DocumentSegment)
+                    .filter(
+                        DocumentSegment.dataset_id.in_(dataset_ids),
+                        DocumentSegment.enabled == True,
+                        DocumentSegment.status == "completed",
+                        DocumentSegment.index_node_id.in_(index_node_ids),
+                    )
+                    .options(load_only(*RETRIEVAL_SEGMENT_COLUMNS))
+                ):
+                    segments.setdefault((segment.dataset_id, segment.index_node_id), segment)
+
             records = []
-            include_segment_ids = set()
-            segment_child_map = {}
+            # (segment id, dataset document, segment, child chunk detail) for every parent-child hit
+            child_hits = []
 
             # Process documents
             for document in documents:
-                document_id = document.metadata.get("document_id")
-                if document_id not in dataset_documents:
-                    continue
-
-                dataset_document = dataset_documents[document_id]
+                metadata = document.metadata
+                dataset_document = dataset_documents.get(metadata.get("document_id"))
                 if not dataset_document:
                     continue
 
+                index_node_id = metadata.get("doc_id")
+                score = metadata.get("score", 0.0)
+
                 if dataset_document.doc_form == IndexType.PARENT_CHILD_INDEX:
                     # Handle parent-child documents
-                    child_index_node_id = document.metadata.get("doc_id")
-
-                    child_chunk = (
-                        db.session.query(ChildChunk).filter(ChildChunk.index_node_id == child_index_node_id).first()
-                    )
+                    child_chunk = child_chunks.get(index_node_id)
 
                     if not child_chunk:
                         continue
 
-                    segment = (
-                        db.session.query(DocumentSegment)
-                        .filter(
-                            DocumentSegment.dataset_id == dataset_document.dataset_id,
-                            DocumentSegment.enabled == True,
-                            DocumentSegment.status == "completed",
-                            DocumentSegment.id == child_chunk.segment_id,
-                        )
-                        .options(
-                            load_only(
-                                DocumentSegment.id,
-                                DocumentSegment.content,
-                                DocumentSegment.answer,
-                            )
-                        )
-                        .first()
-                    )
+                    segment = child_segments.get(child_chunk.segment_id)
 
-                    if not segment:
+                    if not segment or segment.dataset_id != dataset_document.dataset_id:
                         continue
 
-                    if segment.id not in include_segment_ids:
-                        include_segment_ids.add(segment.id)
-                        child_chunk_detail = {
-                            "id": child_chunk.id,
-                            "content": child_chunk.content,
-                            "position": child_chunk.position,
-                            "score": document.metadata.get("score", 0.0),
-                        }
-                        map_detail = {
-                            "max_score": document.metadata.get("score", 0.0),
-                            "child_chunks": [child_chunk_detail],
-                        }
-                        segment_child_map[segment.id] = map_detail
-                        record = {
-                            "document": dataset_document,
-                            "segment": segment,
-                        }
-                        records.append(record)
-                    else:
-                        child_chunk_detail = {
-                            "id": child_chunk.id,
-                            "content": child_chunk.content,
-                            "position": child_chunk.position,
-                            "score": document.metadata.get("score", 0.0),
-                        }
-                        segment_child_map[segment.id]["child_chunks"].append(child_chunk_detail)
-                        segment_child_map[segment.id]["max_score"] = max(
-                            segment_child_map[segment.id]["max_score"], document.metadata.get("score", 0.0)
-                        )
+                    child_chunk_detail = RetrievalChildChunk.model_construct(
+                        id=child_chunk.id,
+                        content=child_chunk.content,
+                        position=child_chunk.position,
+                        score=score,
+                    )
+                    child_hits.append((segment.id, dataset_document, segment, child_chunk_detail))
                 else:
                     # Handle normal documents
-                    index_node_id = document.metadata.get("doc_id")
                     if not index_node_id:
                         continue
 
-                    segment = (
-                        db.session.query(DocumentSegment)
-                        .filter(
-                            DocumentSegment.dataset_id == dataset_document.dataset_id,
-                            DocumentSegment.enabled == True,
-                            DocumentSegment.status == "completed",
-                            DocumentSegment.index_node_id == index_node_id,
-                        )
-                        .first()
-                    )
+                    segment = segments.get((dataset_document.dataset_id, index_node_id))
 
                     if not segment:
                         continue
 
-                    include_segment_ids.add(segment.id)
                     record = {
-                        "document": dataset_document,                        
+                        "document": dataset_document,
                         "segment": segment,
-                        "score": document.metadata.get("score"),  # type: ignore
+                        "score": score,
                     }
                     records.append(record)
 
-            # Add child chunks information to records
-            for record in records:
-                if record["segment"].id in segment_child_map:
-                    record["child_chunks"] = segment_child_map[record["segment"].id].get("child_chunks")  # type: ignore
-                    record["score"] = segment_child_map[record["segment"].id]["max_score"]
+            # Fold the child chunk hits into one record per parent segment, scored by its best child
+            child_hits.sort(key=itemgetter(0))
+            for _, group in groupby(child_hits, key=itemgetter(0)):
+                hits = list(group)
+                child_chunk_details = [hit[3] for hit in hits]
+                records.append(
+                    {
+                        "document": hits[0][1],
+                        "segment": hits[0][2],
+                        "child_chunks": child_chunk_details,
+                        "score": max(detail.score for detail in child_chunk_details),
+                    }
+                )
 
-            return [RetrievalSegments(**record) for record in records]
+            # every field comes straight from ORM rows loaded above, so skip pydantic validation
+            return [RetrievalSegments.model_construct(**record) for record in records]
         except Exception as e:
             db.session.rollback()
             raise e
@@ -1,6 +1,6 @@
-import json
 from typing import Any, Optional
 
+import orjson
 from pydantic import BaseModel, model_validator
 
 _import_err_msg = (
@@ -64,16 +64,22 @@ class AnalyticdbVectorOpenAPI:
         self._client = Client(self._client_config)
 
     def search_by_hybrid(self, query: str, query_vector: list[float], **kwargs: Any) -> list[Document]:
+        """
+        Search the collection by vector similarity.
+        Matched vectors are not returned unless the caller passes include_values=True, in which case
+        they are set on Document.vector; otherwise Document.vector is None.
+        """
         from alibabacloud_gpdb20160503 import models as gpdb_20160503_models
 
         score_threshold = kwargs.get("score_threshold") or 0.0
+        include_values = kwargs.pop("include_values", False)
         request = gpdb_20160503_models.QueryCollectionDataRequest(
             dbinstance_id=self.config.instance_id,
             region_id=self.config.region_id,
             namespace=self.config.namespace,
             namespace_password=self.config.namespace_password,
             collection=self._collection_name,
-            include_values=kwargs.pop("include_values", True),
+            include_values=include_values,
             metrics=self.config.metrics,
             vector=query_vector,
             content=None,
@@ -81,16 +87,18 @@ class AnalyticdbVectorOpenAPI:
             filter=None,
         )
         response = self._client.query_collection_data(request)
+        # matches already come back ranked by score, so a single filtering pass keeps the order
         documents = []
         for match in response.body.matches.match:
             if match.score > score_threshold:
-                metadata = json.loads(match.metadata.get("metadata_"))
+                metadata = match.metadata.get("metadata_")
+                if isinstance(metadata, str | bytes):
+                    metadata = orjson.loads(metadata)
                 metadata["score"] = match.score
                 doc = Document(
                     page_content=match.metadata.get("page_content"),
-                    vector=match.values.value,
+                    vector=match.values.value if include_values else None,
                     metadata=metadata,
                 )
                 documents.append(doc)
-        documents = sorted(documents, key=lambda x: x.metadata["score"] if x.metadata else 0, reverse=True)
         return documents
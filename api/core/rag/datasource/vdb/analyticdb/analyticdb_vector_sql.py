@@ -1,7 +1,8 @@
-import json
+import threading
 from contextlib import contextmanager
-from typing import Any
+from typing import Any, Optional
 
+import psycopg2.extensions  # type: ignore
 import psycopg2.extras  # type: ignore
 import psycopg2.pool  # type: ignore
 from pydantic import BaseModel, model_validator
@@ -9,6 +10,22 @@ from pydantic import BaseModel, model_validator
 from core.rag.models.document import Document
 
 
+class FloatArray(list):
+    """A query vector that psycopg2 renders directly as a real[] literal."""
+
+
+def _adapt_float_array(vector: FloatArray) -> psycopg2.extensions.AsIs:
+    # numbers need no quoting or escaping, so the literal is written out in one pass
+    return psycopg2.extensions.AsIs("'{" + ",".join(map(str, vector)) + "}'")
+
+
+psycopg2.extensions.register_adapter(FloatArray, _adapt_float_array)
+
+# one pool per connection target, shared by every store instance (one is built per request)
+_connection_pools: dict[tuple, psycopg2.pool.AbstractConnectionPool] = {}
+_connection_pools_lock = threading.Lock()
+
+
 class AnalyticdbVectorBySqlConfig(BaseModel):
     host: str
     port: int
@@ -45,24 +62,56 @@ class AnalyticdbVectorBySql:
         self.databaseName = "knowledgebase"
         self.config = config
         self.table_name = f"{self.config.namespace}.{self._collection_name}"
+        # the statement text is identical for every call so the server can reuse its parse and plan;
+        # stored vectors are only sent back to callers that ask for them
+        self._search_sql = self._build_search_sql(include_values=False)
+        self._search_with_values_sql = self._build_search_sql(include_values=True)
         self.pool = self._create_connection_pool()
 
+    def _build_search_sql(self, include_values: bool) -> str:
+        return (
+            f"SELECT t.id AS id, {'t.vector AS vector, ' if include_values else ''}(1.0 - t.score) AS score, "
+            "t.page_content as page_content, t.metadata_ AS metadata_ "
+            "FROM (SELECT id, vector, page_content, metadata_, vector <=> %(query_vector)s AS score "
+            f"FROM {self.table_name} "
+            "WHERE (%(document_ids)s::text[] IS NULL OR metadata_->>'document_id' = ANY(%(document_ids)s::text[])) "
+            "ORDER BY score LIMIT %(top_k)s) t"
+        )
+
     def _create_connection_pool(self):
-        return psycopg2.pool.SimpleConnectionPool(
-            self.config.min_connection,
-            self.config.max_connection,
-            host=self.config.host,
-            port=self.config.port,
-            user=self.config.account,
-            password=self.config.account_password,
-            database=self.databaseName,
+        key = (
+            self.config.host,
+            self.config.port,
+            self.config.account,
+            self.config.account_password,
+            self.databaseName,
         )
+        pool = _connection_pools.get(key)
+        if pool is None:
+            with _connection_pools_lock:
+                pool = _connection_pools.get(key)
+                if pool is None:
+                    pool = psycopg2.pool.ThreadedConnectionPool(
+                        self.config.min_connection,
+                        self.config.max_connection,
+                        host=self.config.host,
+                        port=self.config.port,
+                        user=self.config.account,
+                        password=self.config.account_password,
+                        database=self.databaseName,
+                    )
+                    _connection_pools[key] = pool
+        return pool
 
     @contextmanager
-    def _get_cursor(self):
+    def _get_cursor(self, cursor_factory: Optional[type] = None):
+        """
+        Borrow a pooled connection and yield a cursor on it.
+        Searches are bounded by LIMIT top_k, so a plain client-side cursor is used; pass a cursor_factory for dict rows.
+        """
         assert self.pool is not None, "Connection pool is not initialized"
         conn = self.pool.getconn()
-        cur = conn.cursor()
+        cur = conn.cursor(cursor_factory=cursor_factory)
         try:
             yield cur
         finally:
@@ -76,29 +125,26 @@ class AnalyticdbVectorBySql:
         if not isinstance(top_k, int) or top_k <= 0:
             raise ValueError("top_k must be a positive integer")
         document_ids_filter = kwargs.get("document_ids_filter")
-        where_clause = "WHERE 1=1"
-        if document_ids_filter:
-            document_ids = ", ".join(f"'{id}'" for id in document_ids_filter)
-            where_clause += f"AND metadata_->>'document_id' IN ({document_ids})"
         score_threshold = float(kwargs.get("score_threshold") or 0.0)
-        with self._get_cursor() as cur:
-            query_vector_str = json.dumps(query_vector)
-            query_vector_str = "{" + query_vector_str[1:-1] + "}"
+        include_values = kwargs.get("include_values", False)
+        with self._get_cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
             cur.execute(
-                f"SELECT t.id AS id, t.vector AS vector, (1.0 - t.score) AS score, "
-                f"t.page_content as page_content, t.metadata_ AS metadata_ "
-                f"FROM (SELECT id, vector, page_content, metadata_, vector <=> %s AS score "
-                f"FROM {self.table_name} {where_clause} ORDER BY score LIMIT {top_k} ) t",
-                (query_vector_str,),
+                self._search_with_values_sql if include_values else self._search_sql,
+                {
+                    "query_vector": FloatArray(query_vector),
+                    "document_ids": list(document_ids_filter) if document_ids_filter else None,
+                    "top_k": top_k,
+                },
             )
             documents = []
             for record in cur:
-                id, vector, score, page_content, metadata = record
+                score = record["score"]
                 if score > score_threshold:
+                    metadata = record["metadata_"]
                     metadata["score"] = score
                     doc = Document(
-                        page_content=page_content,
-                        vector=vector,
+                        page_content=record["page_content"],
+                        vector=record["vector"] if include_values else None,
                         metadata=metadata,
                     )
                     documents.append(doc)
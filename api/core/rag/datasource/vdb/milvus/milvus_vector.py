@@ -1,7 +1,11 @@
+import heapq
 import json
 import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Optional
 
+import numpy as np
 from packaging import version
 from pydantic import BaseModel, model_validator
 from pymilvus import AnnSearchRequest, MilvusClient, WeightedRanker  # type: ignore
@@ -17,6 +21,18 @@ from models.dataset import Dataset
 
 logger = logging.getLogger(__name__)
 
+# weights applied to the BM25 and dense scores when fusing hybrid search results
+SPARSE_WEIGHT = 0.3
+DENSE_WEIGHT = 0.7
+
+# search parameters and ranker are identical for every hybrid search, build them once
+SPARSE_SEARCH_PARAMS = {"metric_type": "BM25"}
+DENSE_SEARCH_PARAMS = {"metric_type": "IP"}
+HYBRID_RANKER = WeightedRanker(SPARSE_WEIGHT, DENSE_WEIGHT)
+
+# shared by all collections; each parallel hybrid search submits exactly two searches
+_search_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="milvus_search")
+
 
 class MilvusConfig(BaseModel):
     """
@@ -30,6 +46,7 @@ class MilvusConfig(BaseModel):
     batch_size: int = 100  # Batch size for operations
     database: str = "default"  # Database name
     enable_hybrid_search: bool = False  # Flag to enable hybrid search
+    parallel_hybrid_search: bool = False  # Run the dense and sparse searches concurrently
     analyzer_params: Optional[str] = None  # Analyzer params
 
     @model_validator(mode="before")
@@ -97,7 +114,11 @@ class MilvusVector(BaseVector):
         return VectorType.MILVUS
 
     def _process_search_results(
-        self, results: list[Any], output_fields: list[str], score_threshold: float = 0.0
+        self,
+        results: list[Any],
+        output_fields: list[str],
+        score_threshold: float = 0.0,
+        top_k: Optional[int] = None,
     ) -> list[Document]:
         """
         Common method to process search results
@@ -105,16 +126,23 @@ class MilvusVector(BaseVector):
         :param results: Search results
         :param output_fields: Fields to be output
         :param score_threshold: Score threshold for filtering
+        :param top_k: Maximum number of documents to return, best scores first
         :return: List of documents
         """
-        docs = []
-        for result in results[0]:
-            metadata = result["entity"].get(output_fields[1], {})
-            metadata["score"] = result["distance"]
+        hits = results[0]
+        distances = np.fromiter((hit["distance"] for hit in hits), dtype=np.float64, count=len(hits))
 
-            if result["distance"] > score_threshold:
-                doc = Document(page_content=result["entity"].get(output_fields[0], ""), metadata=metadata)
-                docs.append(doc)
+        # only the best top_k hits above the threshold are turned into documents
+        keep = np.flatnonzero(distances > score_threshold)
+        if top_k is not None and len(keep) > top_k:
+            keep = heapq.nlargest(top_k, keep, key=distances.__getitem__)
+
+        docs = []
+        for i in keep:
+            hit = hits[i]
+            metadata = hit["entity"].get(output_fields[1], {})
+            metadata["score"] = hit["distance"]
+            docs.append(Document(page_content=hit["entity"].get(output_fields[0], ""), metadata=metadata))
 
         return docs
 
@@ -122,6 +150,7 @@ class MilvusVector(BaseVector):
         """
         Search for documents by vector similarity.
         """
+        top_k = kwargs.get("top_k", 4)
         document_ids_filter = kwargs.get("document_ids_filter")
         filter = ""
         if document_ids_filter:
@@ -132,8 +161,8 @@ class MilvusVector(BaseVector):
         sparse_request = AnnSearchRequest(
             [query],
             Field.SPARSE_VECTOR.value,
-            {"metric_type": "BM25"},
-            limit=kwargs.get("top_k", 4),
+            SPARSE_SEARCH_PARAMS,
+            limit=top_k,
             expr=filter,
         )
 
@@ -141,25 +170,64 @@ class MilvusVector(BaseVector):
         dense_request = AnnSearchRequest(
             [query_vector],
             Field.VECTOR.value,
-            {"metric_type": "IP"},
-            limit=kwargs.get("top_k", 4),
+            DENSE_SEARCH_PARAMS,
+            limit=top_k,
             expr=filter,
         )
 
-        results = self._client.hybrid_search(
-            collection_name=self._collection_name,
-            reqs=[sparse_request, dense_request],
-            ranker=WeightedRanker(0.3, 0.7),
-            limit=kwargs.get("top_k", 4),
-            output_fields=[Field.CONTENT_KEY.value, Field.METADATA_KEY.value],
-        )
+        if self._client_config.parallel_hybrid_search:
+            results = self._parallel_hybrid_search(sparse_request, dense_request, limit=top_k)
+        else:
+            results = self._client.hybrid_search(
+                collection_name=self._collection_name,
+                reqs=[sparse_request, dense_request],
+                ranker=HYBRID_RANKER,
+                limit=top_k,
+                output_fields=[Field.CONTENT_KEY.value, Field.METADATA_KEY.value],
+            )
 
         return self._process_search_results(
             results,
             output_fields=[Field.CONTENT_KEY.value, Field.METADATA_KEY.value],
             score_threshold=float(kwargs.get("score_threshold") or 0.0),
+            top_k=top_k,
+        )
+
+    def _parallel_hybrid_search(
+        self, sparse_request: AnnSearchRequest, dense_request: AnnSearchRequest, limit: int
+    ) -> list[list[dict]]:
+        """
+        Issue the BM25 and dense searches concurrently and fuse them the way WeightedRanker does,
+        so the scores stay comparable with the server-side hybrid_search.
+
+        :return: Fused results shaped like a single-query search response
+        """
+        sparse_future, dense_future = (
+            _search_executor.submit(
+                self._client.search,
+                collection_name=self._collection_name,
+                data=request.data,
+                anns_field=request.anns_field,
+                search_params=request.param,
+                limit=request.limit,
+                filter=request.expr or "",
+                output_fields=[Field.CONTENT_KEY.value, Field.METADATA_KEY.value],
+            )
+            for request in (sparse_request, dense_request)
         )
 
+        fused: dict[Any, dict] = {}
+        # Milvus normalizes BM25 and IP scores with arctan before weighting them
+        for hits, weight, normalize in (
+            (sparse_future.result()[0], SPARSE_WEIGHT, lambda d: 2 * math.atan(d) / math.pi),
+            (dense_future.result()[0], DENSE_WEIGHT, lambda d: 0.5 + math.atan(d) / math.pi),
+        ):
+            for hit in hits:
+                entry = fused.setdefault(hit["id"], {"id": hit["id"], "distance": 0.0, "entity": hit["entity"]})
+                entry["distance"] += weight * normalize(hit["distance"])
+
+        return [sorted(fused.values(), key=lambda hit: hit["distance"], reverse=True)[:limit]]
+
     def _init_client(self, config: MilvusConfig) -> MilvusClient:
         """
         Initialize and return a Milvus client.
@@ -197,6 +265,7 @@ class MilvusVectorFactory(AbstractVectorFactory):
                 password=dify_config.MILVUS_PASSWORD or "",
                 database=dify_config.MILVUS_DATABASE or "",
                 enable_hybrid_search=dify_config.MILVUS_ENABLE_HYBRID_SEARCH or False,
+                parallel_hybrid_search=dify_config.MILVUS_PARALLEL_HYBRID_SEARCH,
                 analyzer_params=dify_config.MILVUS_ANALYZER_PARAMS or "",
             ),
         )
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 from abc import ABC, abstractmethod
 from typing import Any
 
@@ -18,6 +19,10 @@ class BaseVector(ABC):
     def search_by_hybrid(self, query: str, query_vector: list[float], **kwargs: Any) -> list[Document]:
         raise NotImplementedError
 
+    async def asearch_by_hybrid(self, query: str, query_vector: list[float], **kwargs: Any) -> list[Document]:
+        """Coroutine variant of search_by_hybrid; stores with a native async client may override it."""
+        return await asyncio.to_thread(self.search_by_hybrid, query, query_vector, **kwargs)
+
     @property
     def collection_name(self):
         return self._collection_name
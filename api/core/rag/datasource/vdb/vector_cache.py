@@ -0,0 +1,166 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any, Optional
+
+import numpy as np
+
+from configs import dify_config
+from core.rag.datasource.vdb.vector_base import BaseVector
+from core.rag.models.document import Document
+
+# number of LSH hash tables and bits per table used by the semantic tier
+LSH_TABLES = 8
+LSH_BITS = 16
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, list | tuple | set | frozenset):
+        items = [_freeze(item) for item in value]
+        return tuple(sorted(items, key=repr) if isinstance(value, set | frozenset) else items)
+    return value
+
+
+class _CacheEntry:
+    __slots__ = ("documents", "embedding", "expires_at", "buckets")
+
+    def __init__(self, documents: list[Document], embedding: np.ndarray, expires_at: float, buckets: list[Hashable]):
+        self.documents = documents
+        self.embedding = embedding
+        self.expires_at = expires_at
+        self.buckets = buckets
+
+
+class VectorSearchCache:
+    """
+    Process-local cache of search_by_hybrid results.
+    Exact hits are keyed on the collection, query text and search arguments; misses fall back to
+    random-projection LSH over the query embedding and accept a neighbour above similarity_threshold.
+    """
+
+    def __init__(self, max_size: int, ttl: float, similarity_threshold: float):
+        self._max_size = max_size
+        self._ttl = ttl
+        self._similarity_threshold = similarity_threshold
+        self._entries: OrderedDict[Hashable, _CacheEntry] = OrderedDict()
+        self._buckets: dict[Hashable, set[Hashable]] = {}
+        self._planes: dict[int, np.ndarray] = {}
+        self._powers = np.uint64(1) << np.arange(LSH_BITS, dtype=np.uint64)
+        self._lock = threading.Lock()
+
+    def get(self, scope: Hashable, query: str, embedding: np.ndarray) -> Optional[list[Document]]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get((scope, query))
+            if entry is not None and entry.expires_at > now:
+                self._entries.move_to_end((scope, query))
+                return self._copy(entry.documents)
+
+            candidates: dict[Hashable, int] = {}
+            for bucket in self._bucket_keys(scope, embedding):
+                for key in self._buckets.get(bucket, ()):
+                    candidates[key] = candidates.get(key, 0) + 1
+
+            best_key, best_similarity = None, self._similarity_threshold
+            # check the keys sharing the most buckets first, they are the likeliest neighbours
+            for key in sorted(candidates, key=candidates.__getitem__, reverse=True)[:LSH_TABLES]:
+                candidate = self._entries[key]
+                if candidate.expires_at <= now:
+                    continue
+                similarity = float(candidate.embedding @ embedding)
+                if similarity >= best_similarity:
+                    best_key, best_similarity = key, similarity
+            if best_key is None:
+                return None
+            self._entries.move_to_end(best_key)
+            return self._copy(self._entries[best_key].documents)
+
+    def put(self, scope: Hashable, query: str, embedding: np.ndarray, documents: list[Document]) -> None:
+        key = (scope, query)
+        with self._lock:
+            self._remove(key)
+            buckets = self._bucket_keys(scope, embedding)
+            self._entries[key] = _CacheEntry(self._copy(documents), embedding, time.monotonic() + self._ttl, buckets)
+            for bucket in buckets:
+                self._buckets.setdefault(bucket, set()).add(key)
+            while len(self._entries) > self._max_size:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for bucket in entry.buckets:
+            keys = self._buckets.get(bucket)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._buckets[bucket]
+
+    def _bucket_keys(self, scope: Hashable, embedding: np.ndarray) -> list[Hashable]:
+        planes = self._planes.get(embedding.shape[0])
+        if planes is None:
+            # fixed seed so every worker in a deployment hashes the same way
+            rng = np.random.default_rng(embedding.shape[0])
+            planes = rng.standard_normal((embedding.shape[0], LSH_TABLES * LSH_BITS)).astype(np.float32)
+            self._planes[embedding.shape[0]] = planes
+        bits = (embedding @ planes > 0).reshape(LSH_TABLES, LSH_BITS).astype(np.uint64)
+        codes = bits @ self._powers
+        return [(scope, table, int(code)) for table, code in enumerate(codes)]
+
+    @staticmethod
+    def _copy(documents: list[Document]) -> list[Document]:
+        # callers mutate metadata (e.g. the score), so never hand out the cached instances
+        return copy.deepcopy(documents)
+
+
+_search_cache: Optional[VectorSearchCache] = None
+_search_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> VectorSearchCache:
+    global _search_cache
+    if _search_cache is None:
+        with _search_cache_lock:
+            if _search_cache is None:
+                _search_cache = VectorSearchCache(
+                    max_size=dify_config.VECTOR_SEARCH_CACHE_MAX_SIZE,
+                    ttl=dify_config.VECTOR_SEARCH_CACHE_TTL,
+                    similarity_threshold=dify_config.VECTOR_SEARCH_CACHE_SIMILARITY_THRESHOLD,
+                )
+    return _search_cache
+
+
+class CachedVector(BaseVector):
+    """Wraps a vector store and serves repeated or near-identical searches from VectorSearchCache."""
+
+    def __init__(self, vector: BaseVector):
+        super().__init__(vector.collection_name)
+        self._vector = vector
+
+    def get_type(self) -> str:
+        return self._vector.get_type()
+
+    def search_by_hybrid(self, query: str, query_vector: list[float], **kwargs: Any) -> list[Document]:
+        embedding = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(embedding)
+        if not norm:
+            return self._vector.search_by_hybrid(query, query_vector, **kwargs)
+        embedding /= norm
+
+        scope = (self.get_type(), self._collection_name, _freeze(kwargs))
+        cache = get_search_cache()
+        documents = cache.get(scope, query, embedding)
+        if documents is None:
+            documents = self._vector.search_by_hybrid(query, query_vector, **kwargs)
+            cache.put(scope, query, embedding, documents)
+        return documents
+
+    def __getattr__(self, name):
+        if name == "_vector":
+            raise AttributeError(name)
+        return getattr(self._vector, name)
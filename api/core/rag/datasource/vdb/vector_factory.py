@@ -1,3 +1,4 @@
+import asyncio
 from abc import ABC, abstractmethod
 from typing import Any, Optional
 
@@ -52,7 +53,12 @@ class Vector:
             raise ValueError("Vector store must be specified.")
 
         vector_factory_cls = self.get_vector_factory(vector_type)
-        return vector_factory_cls().init_vector(self._dataset, self._attributes, self._embeddings)
+        vector = vector_factory_cls().init_vector(self._dataset, self._attributes, self._embeddings)
+        if dify_config.VECTOR_SEARCH_CACHE_ENABLED:
+            from core.rag.datasource.vdb.vector_cache import CachedVector
+
+            vector = CachedVector(vector)
+        return vector
 
     @staticmethod
     def get_vector_factory(vector_type: str) -> type[AbstractVectorFactory]:
@@ -166,10 +172,21 @@ class Vector:
             case _:
                 raise ValueError(f"Vector store {vector_type} is not supported.")
 
-    def search_by_hybrid(self, query: str, **kwargs: Any) -> list[Document]:
-        query_vector = self._embeddings.embed_query(query)
+    def embed_query(self, query: str) -> list[float]:
+        return self._embeddings.embed_query(query)
+
+    def search_by_hybrid(self, query: str, query_vector: Optional[list[float]] = None, **kwargs: Any) -> list[Document]:
+        if query_vector is None:
+            query_vector = self._embeddings.embed_query(query)
         return self._vector_processor.search_by_hybrid(query, query_vector, **kwargs)
 
+    async def asearch_by_hybrid(
+        self, query: str, query_vector: Optional[list[float]] = None, **kwargs: Any
+    ) -> list[Document]:
+        if query_vector is None:
+            query_vector = await asyncio.to_thread(self._embeddings.embed_query, query)
+        return await self._vector_processor.asearch_by_hybrid(query, query_vector, **kwargs)
+
     def _get_embeddings(self) -> Embeddings:
         model_manager = ModelManager()
 
@@ -1,4 +1,5 @@
 import json
+import threading
 from typing import Any, Optional
 
 import requests
@@ -13,6 +14,10 @@ from core.rag.embedding.embedding_base import Embeddings
 from core.rag.models.document import Document
 from models.dataset import Dataset
 
+# one client per endpoint, shared by every store instance (one is built per dataset per request)
+_clients: dict[tuple[str, Optional[str], int], weaviate.Client] = {}
+_clients_lock = threading.Lock()
+
 
 class WeaviateConfig(BaseModel):
     endpoint: str
@@ -34,6 +39,18 @@ class WeaviateVector(BaseVector):
         self._attributes = attributes
 
     def _init_client(self, config: WeaviateConfig) -> weaviate.Client:
+        key = (config.endpoint, config.api_key, config.batch_size)
+        client = _clients.get(key)
+        if client is None:
+            with _clients_lock:
+                client = _clients.get(key)
+                if client is None:
+                    client = self._create_client(config)
+                    _clients[key] = client
+        return client
+
+    @staticmethod
+    def _create_client(config: WeaviateConfig) -> weaviate.Client:
         auth_config = weaviate.auth.AuthApiKey(api_key=config.api_key)
 
         weaviate.connect.connection.has_grpc = False
@@ -3,6 +3,7 @@ import logging
 from typing import Any, Optional, cast
 
 import numpy as np
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
 
 from configs import dify_config
@@ -76,20 +77,27 @@ class CacheEmbedding(Embeddings):
                             db.session.rollback()
                         except Exception:
                             logging.exception("Failed transform embedding")
-                cache_embeddings = []
+                cache_embeddings: dict[str, dict[str, Any]] = {}
                 try:
                     for i, n_embedding in zip(embedding_queue_indices, embedding_queue_embeddings):
                         text_embeddings[i] = n_embedding
                         hash = helper.generate_text_hash(texts[i])
                         if hash not in cache_embeddings:
-                            embedding_cache = Embedding(
-                                model_name=self._model_instance.model,
-                                hash=hash,
-                                provider_name=self._model_instance.provider,
-                            )
-                            embedding_cache.set_embedding(n_embedding)
-                            db.session.add(embedding_cache)
-                            cache_embeddings.append(hash)
+                            cache_embeddings[hash] = {
+                                "model_name": self._model_instance.model,
+                                "hash": hash,
+                                "provider_name": self._model_instance.provider,
+                                "embedding": Embedding.serialize_embedding(n_embedding),
+                            }
+                    if cache_embeddings:
+                        # one multi-row INSERT per batch; rows another worker cached meanwhile are skipped
+                        # instead of failing the whole batch
+                        db.session.execute(
+                            pg_insert(Embedding).on_conflict_do_nothing(
+                                index_elements=["model_name", "hash", "provider_name"]
+                            ),
+                            list(cache_embeddings.values()),
+                        )
                     db.session.commit()
                 except IntegrityError:
                     db.session.rollback()
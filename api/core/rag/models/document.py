@@ -1,9 +1,9 @@
+from dataclasses import dataclass, field
 from typing import Optional
 
-from pydantic import BaseModel
 
-
-class ChildDocument(BaseModel):
+@dataclass(slots=True)
+class ChildDocument:
     """Class for storing a piece of text and associated metadata."""
 
     page_content: str
@@ -13,10 +13,11 @@ class ChildDocument(BaseModel):
     """Arbitrary metadata about the page content (e.g., source, relationships to other
         documents, etc.).
     """
-    metadata: dict = {}
+    metadata: dict = field(default_factory=dict)
 
 
-class Document(BaseModel):
+@dataclass(slots=True)
+class Document:
     """Class for storing a piece of text and associated metadata."""
 
     page_content: str
@@ -26,7 +27,7 @@ class Document(BaseModel):
     """Arbitrary metadata about the page content (e.g., source, relationships to other
         documents, etc.).
     """
-    metadata: dict = {}
+    metadata: dict = field(default_factory=dict)
 
     provider: Optional[str] = "dify"
 
@@ -1,4 +1,6 @@
+import hmac
 import json
+from typing import Optional
 
 import flask_login  # type: ignore
 from flask import Response, request
@@ -8,10 +10,29 @@ from werkzeug.exceptions import Unauthorized
 from configs import dify_config
 from dify_app import DifyApp
 from extensions.ext_database import db
-from models.account import Account, Tenant, TenantAccountJoin
+from extensions.ext_redis import redis_client
+from models.account import Account, Tenant, TenantAccountJoin, TenantAccountRole
 
 login_manager = flask_login.LoginManager()
 
+# seconds a workspace owner resolved for admin API key auth is served from Redis
+ADMIN_AUTH_CACHE_TTL = 60
+# columns kept in Redis to rebuild the owner and tenant without touching the database
+ADMIN_AUTH_TENANT_COLUMNS = ("id", "name", "plan", "status", "custom_config")
+ADMIN_AUTH_ACCOUNT_COLUMNS = (
+    "id",
+    "name",
+    "email",
+    "avatar",
+    "interface_language",
+    "interface_theme",
+    "timezone",
+    "status",
+)
+# body of every 401, serialized once; a fresh Response is still built per request since
+# after_request hooks (e.g. CORS) add headers to it
+UNAUTHORIZED_BODY = json.dumps({"code": "unauthorized", "message": "Unauthorized."}).encode()
+
 
 # Flask-Login configuration
 @login_manager.request_loader
@@ -32,22 +53,46 @@ def load_user_from_request(request_from_flask_login):
     # Check for admin API key authentication first
     if dify_config.ADMIN_API_KEY_ENABLE and auth_header:
         admin_api_key = dify_config.ADMIN_API_KEY
-        if admin_api_key and admin_api_key == auth_token:
+        if admin_api_key and auth_token and hmac.compare_digest(admin_api_key.encode(), auth_token.encode()):
             workspace_id = request.headers.get("X-WORKSPACE-ID")
             if workspace_id:
-                tenant_account_join = (
-                    db.session.query(Tenant, TenantAccountJoin)
-                    .filter(Tenant.id == workspace_id)
-                    .filter(TenantAccountJoin.tenant_id == Tenant.id)
-                    .filter(TenantAccountJoin.role == "owner")
-                    .one_or_none()
-                )
-                if tenant_account_join:
-                    tenant, ta = tenant_account_join
-                    account = db.session.query(Account).filter_by(id=ta.account_id).first()
-                    if account:
-                        account.current_tenant = tenant
-                        return account
+                return _load_workspace_owner(workspace_id)
+
+
+def _load_workspace_owner(workspace_id: str) -> Optional[Account]:
+    """Resolve the owner of a workspace with the workspace set as its current tenant."""
+    cache_key = f"admin_auth_owner:{workspace_id}"
+    cached = redis_client.get(cache_key)
+    if cached:
+        data = json.loads(cached)
+        tenant = Tenant(**data["tenant"])
+        account = Account(**data["account"])
+    else:
+        owner = (
+            db.session.query(Tenant, Account)
+            .join(TenantAccountJoin, TenantAccountJoin.tenant_id == Tenant.id)
+            .join(Account, Account.id == TenantAccountJoin.account_id)
+            .filter(Tenant.id == workspace_id, TenantAccountJoin.role == TenantAccountRole.OWNER)
+            .first()
+        )
+        if not owner:
+            return None
+        tenant, account = owner
+        redis_client.setex(
+            cache_key,
+            ADMIN_AUTH_CACHE_TTL,
+            json.dumps(
+                {
+                    "tenant": {column: getattr(tenant, column) for column in ADMIN_AUTH_TENANT_COLUMNS},
+                    "account": {column: getattr(account, column) for column in ADMIN_AUTH_ACCOUNT_COLUMNS},
+                }
+            ),
+        )
+
+    # the join already proved the owner role, so set the tenant without the lookup in the current_tenant setter
+    account.role = TenantAccountRole.OWNER
+    account._current_tenant = tenant
+    return account
 
 
 @user_logged_in.connect
@@ -66,7 +111,7 @@ def on_user_logged_in(_sender, user):
 def unauthorized_handler():
     """Handle unauthorized requests."""
     return Response(
-        json.dumps({"code": "unauthorized", "message": "Unauthorized."}),
+        UNAUTHORIZED_BODY,
         status=401,
         content_type="application/json",
     )
@@ -1,6 +1,34 @@
+import os
+import time
+import uuid
 from hashlib import sha256
 
+# the "None" suffix is part of the persisted hash format shared with the ingest side, keep it
+_TEXT_HASH_SUFFIX = b"None"
+# texts longer than this many characters are encoded and hashed slice by slice
+_TEXT_HASH_CHUNK_SIZE = 1 << 20
+
 
 def generate_text_hash(text: str) -> str:
-    hash_text = str(text) + "None"
-    return sha256(hash_text.encode()).hexdigest()
+    if len(text) <= _TEXT_HASH_CHUNK_SIZE:
+        hasher = sha256(text.encode())
+    else:
+        # utf-8 encodes each code point independently, so the slices hash the same as the whole text
+        # without materializing one bytes copy of it
+        hasher = sha256()
+        for start in range(0, len(text), _TEXT_HASH_CHUNK_SIZE):
+            hasher.update(text[start : start + _TEXT_HASH_CHUNK_SIZE].encode())
+    hasher.update(_TEXT_HASH_SUFFIX)
+    return hasher.hexdigest()
+
+
+def uuidv7() -> str:
+    """
+    Time-ordered UUID (RFC 9562 version 7): a 48-bit millisecond timestamp followed by random bits.
+    Rows keyed by it are appended at the right edge of the primary key index instead of scattered across it.
+    """
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), "big")
+    # version 7 in bits 76-79, RFC 4122 variant in bits 62-63
+    value = value & ~(0xF << 76) | 0x7 << 76
+    value = value & ~(0x3 << 62) | 0x2 << 62
+    return str(uuid.UUID(int=value))
@@ -1,27 +1,64 @@
-from .account import (
-    Account,
-    AccountIntegrate,
-    AccountStatus,
-    Tenant,
-    TenantAccountJoin,
-    TenantAccountRole,
-    TenantStatus,
-)
-from .dataset import (
-    Dataset,
-    DatasetCollectionBinding,
-    DatasetPermissionEnum,
-    Document,
-    DocumentSegment,
-    Embedding,
-    TidbAuthBinding,
-    Whitelist,
-)
-from .engine import db
-from .model import (
-    ApiToken,
-    UploadFile,
-)
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .account import (
+        Account,
+        AccountIntegrate,
+        AccountStatus,
+        Tenant,
+        TenantAccountJoin,
+        TenantAccountRole,
+        TenantStatus,
+    )
+    from .dataset import (
+        Dataset,
+        DatasetCollectionBinding,
+        DatasetPermissionEnum,
+        Document,
+        DocumentSegment,
+        Embedding,
+        TidbAuthBinding,
+        Whitelist,
+    )
+    from .engine import db
+    from .model import (
+        ApiToken,
+        UploadFile,
+    )
+
+# submodule defining each re-exported name; resolved on first access so that importing one
+# model module (or models.engine) does not map every other model as well
+_EXPORT_MODULES = {
+    "Account": ".account",
+    "AccountIntegrate": ".account",
+    "AccountStatus": ".account",
+    "Tenant": ".account",
+    "TenantAccountJoin": ".account",
+    "TenantAccountRole": ".account",
+    "TenantStatus": ".account",
+    "Dataset": ".dataset",
+    "DatasetCollectionBinding": ".dataset",
+    "DatasetPermissionEnum": ".dataset",
+    "Document": ".dataset",
+    "DocumentSegment": ".dataset",
+    "Embedding": ".dataset",
+    "TidbAuthBinding": ".dataset",
+    "Whitelist": ".dataset",
+    "db": ".engine",
+    "ApiToken": ".model",
+    "UploadFile": ".model",
+}
+
+
+def __getattr__(name: str):
+    module_name = _EXPORT_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     "Account",
@@ -1,9 +1,10 @@
 import enum
-import json
 from typing import Optional, cast
 
+import orjson
+from flask import g, has_request_context
 from flask_login import UserMixin  # type: ignore
-from sqlalchemy import func
+from sqlalchemy import func, select
 from sqlalchemy.orm import Mapped, mapped_column, reconstructor
 
 from models.base import Base
@@ -23,19 +24,13 @@ class TenantAccountRole(enum.StrEnum):
     def is_valid_role(role: str) -> bool:
         if not role:
             return False
-        return role in {
-            TenantAccountRole.OWNER,
-            TenantAccountRole.ADMIN,
-            TenantAccountRole.EDITOR,
-            TenantAccountRole.NORMAL,
-            TenantAccountRole.DATASET_OPERATOR,
-        }
+        return role in TenantAccountRole._value2member_map_
 
     @staticmethod
     def is_privileged_role(role: Optional["TenantAccountRole"]) -> bool:
         if not role:
             return False
-        return role in {TenantAccountRole.OWNER, TenantAccountRole.ADMIN}
+        return role in _PRIVILEGED_ROLES
 
     @staticmethod
     def is_admin_role(role: Optional["TenantAccountRole"]) -> bool:
@@ -47,29 +42,40 @@ class TenantAccountRole(enum.StrEnum):
     def is_non_owner_role(role: Optional["TenantAccountRole"]) -> bool:
         if not role:
             return False
-        return role in {
-            TenantAccountRole.ADMIN,
-            TenantAccountRole.EDITOR,
-            TenantAccountRole.NORMAL,
-            TenantAccountRole.DATASET_OPERATOR,
-        }
+        return role in _NON_OWNER_ROLES
 
     @staticmethod
     def is_editing_role(role: Optional["TenantAccountRole"]) -> bool:
         if not role:
             return False
-        return role in {TenantAccountRole.OWNER, TenantAccountRole.ADMIN, TenantAccountRole.EDITOR}
+        return role in _EDITING_ROLES
 
     @staticmethod
     def is_dataset_edit_role(role: Optional["TenantAccountRole"]) -> bool:
         if not role:
             return False
-        return role in {
-            TenantAccountRole.OWNER,
-            TenantAccountRole.ADMIN,
-            TenantAccountRole.EDITOR,
-            TenantAccountRole.DATASET_OPERATOR,
-        }
+        return role in _DATASET_EDIT_ROLES
+
+
+# role groups checked on every permission test, built once instead of per call
+_PRIVILEGED_ROLES = frozenset({TenantAccountRole.OWNER, TenantAccountRole.ADMIN})
+_NON_OWNER_ROLES = frozenset(
+    {
+        TenantAccountRole.ADMIN,
+        TenantAccountRole.EDITOR,
+        TenantAccountRole.NORMAL,
+        TenantAccountRole.DATASET_OPERATOR,
+    }
+)
+_EDITING_ROLES = frozenset({TenantAccountRole.OWNER, TenantAccountRole.ADMIN, TenantAccountRole.EDITOR})
+_DATASET_EDIT_ROLES = frozenset(
+    {
+        TenantAccountRole.OWNER,
+        TenantAccountRole.ADMIN,
+        TenantAccountRole.EDITOR,
+        TenantAccountRole.DATASET_OPERATOR,
+    }
+)
 
 
 class AccountStatus(enum.StrEnum):
@@ -116,9 +122,9 @@ class Account(UserMixin, Base):
 
     @current_tenant.setter
     def current_tenant(self, tenant: "Tenant"):
-        ta = db.session.query(TenantAccountJoin).filter_by(tenant_id=tenant.id, account_id=self.id).first()
-        if ta:
-            self.role = TenantAccountRole(ta.role)
+        tenant_account_join = self._load_tenant_join(tenant.id)
+        if tenant_account_join:
+            self.role = TenantAccountRole(tenant_account_join[1].role)
             self._current_tenant = tenant
             return
         self._current_tenant = None
@@ -128,8 +134,25 @@ class Account(UserMixin, Base):
         return self._current_tenant.id if self._current_tenant else None
 
     def set_tenant_id(self, tenant_id: str):
+        tenant_account_join = self._load_tenant_join(tenant_id)
+
+        if not tenant_account_join:
+            return
+
+        tenant, join = tenant_account_join
+        self.role = join.role
+        self._current_tenant = tenant
+
+    def _load_tenant_join(self, tenant_id: str) -> Optional[tuple["Tenant", "TenantAccountJoin"]]:
+        """Load the tenant and this account's membership in it, at most once per request."""
+        cache: Optional[dict] = None
+        if has_request_context():
+            cache = g.setdefault("_tenant_join_cache", {})
+            if (self.id, tenant_id) in cache:
+                return cache[(self.id, tenant_id)]
+
         tenant_account_join = cast(
-            tuple[Tenant, TenantAccountJoin],
+            Optional[tuple[Tenant, TenantAccountJoin]],
             (
                 db.session.query(Tenant, TenantAccountJoin)
                 .filter(Tenant.id == tenant_id)
@@ -138,13 +161,9 @@ class Account(UserMixin, Base):
                 .one_or_none()
             ),
         )
-
-        if not tenant_account_join:
-            return
-
-        tenant, join = tenant_account_join
-        self.role = join.role
-        self._current_tenant = tenant
+        if cache is not None:
+            cache[(self.id, tenant_id)] = tenant_account_join
+        return tenant_account_join
 
     @property
     def current_role(self):
@@ -156,31 +175,28 @@ class Account(UserMixin, Base):
 
     @classmethod
     def get_by_openid(cls, provider: str, open_id: str):
-        account_integrate = (
-            db.session.query(AccountIntegrate)
-            .filter(AccountIntegrate.provider == provider, AccountIntegrate.open_id == open_id)
-            .one_or_none()
+        return db.session.scalar(
+            select(Account)
+            .join(AccountIntegrate, AccountIntegrate.account_id == Account.id)
+            .where(AccountIntegrate.provider == provider, AccountIntegrate.open_id == open_id)
         )
-        if account_integrate:
-            return db.session.query(Account).filter(Account.id == account_integrate.account_id).one_or_none()
-        return None
 
     # check current_user.current_tenant.current_role in ['admin', 'owner']
     @property
     def is_admin_or_owner(self):
-        return TenantAccountRole.is_privileged_role(self.role)
+        return self.role in _PRIVILEGED_ROLES
 
     @property
     def is_admin(self):
-        return TenantAccountRole.is_admin_role(self.role)
+        return self.role == TenantAccountRole.ADMIN
 
     @property
     def is_editor(self):
-        return TenantAccountRole.is_editing_role(self.role)
+        return self.role in _EDITING_ROLES
 
     @property
     def is_dataset_editor(self):
-        return TenantAccountRole.is_dataset_edit_role(self.role)
+        return self.role in _DATASET_EDIT_ROLES
 
     @property
     def is_dataset_operator(self):
@@ -206,26 +222,37 @@ class Tenant(Base):
     updated_at = db.Column(db.DateTime, nullable=False, server_default=func.current_timestamp())
 
     def get_accounts(self) -> list[Account]:
-        return (
-            db.session.query(Account)
-            .filter(Account.id == TenantAccountJoin.account_id, TenantAccountJoin.tenant_id == self.id)
-            .all()
+        return list(
+            db.session.scalars(
+                select(Account)
+                .join(TenantAccountJoin, TenantAccountJoin.account_id == Account.id)
+                .where(TenantAccountJoin.tenant_id == self.id)
+            ).all()
         )
 
+    # (raw custom_config, parsed dict) of the last decode, reused while the column is unchanged
+    _custom_config_cache = None
+
     @property
     def custom_config_dict(self) -> dict:
-        return json.loads(self.custom_config) if self.custom_config else {}
+        if not self.custom_config:
+            return {}
+        if self._custom_config_cache is None or self._custom_config_cache[0] is not self.custom_config:
+            self._custom_config_cache = (self.custom_config, orjson.loads(self.custom_config))
+        return self._custom_config_cache[1]
 
     @custom_config_dict.setter
     def custom_config_dict(self, value: dict):
-        self.custom_config = json.dumps(value)
+        self.custom_config = orjson.dumps(value).decode()
+        self._custom_config_cache = (self.custom_config, value)
 
 
 class TenantAccountJoin(Base):
     __tablename__ = "tenant_account_joins"
     __table_args__ = (
         db.PrimaryKeyConstraint("id", name="tenant_account_join_pkey"),
-        db.Index("tenant_account_join_account_id_idx", "account_id"),
+        # serves load_user's current-membership lookup (account_id, current DESC, id) and plain account_id filters
+        db.Index("tenant_account_join_account_current_idx", "account_id", db.text("current DESC"), "id"),
         db.Index("tenant_account_join_tenant_id_idx", "tenant_id"),
         db.UniqueConstraint("tenant_id", "account_id", name="unique_tenant_account_join"),
     )
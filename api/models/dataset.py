@@ -1,18 +1,23 @@
 import base64
 import enum
+import functools
 import hashlib
 import hmac
-import json
+import operator
 import os
 import pickle
 import re
 import time
-from json import JSONDecodeError
-from typing import cast
+from collections.abc import Set as AbstractSet
+from typing import Any, cast
 
-from sqlalchemy import func
+import orjson
+from sqlalchemy import and_, case, func
+from sqlalchemy import cast as sqlalchemy_cast
 from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.orm import Mapped
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import Mapped, relationship
+from sqlalchemy.orm.attributes import set_committed_value
 
 from configs import dify_config
 from core.rag.index_processor.constant.built_in_field import BuiltInField, MetadataDataSource
@@ -36,7 +41,12 @@ class Dataset(Base):
     __table_args__ = (
         db.PrimaryKeyConstraint("id", name="dataset_pkey"),
         db.Index("dataset_tenant_idx", "tenant_id"),
-        db.Index("retrieval_model_idx", "retrieval_model", postgresql_using="gin"),
+        db.Index(
+            "retrieval_model_idx",
+            "retrieval_model",
+            postgresql_using="gin",
+            postgresql_ops={"retrieval_model": "jsonb_path_ops"},
+        ),
     )
 
     INDEXING_TECHNIQUE_LIST = ["high_quality", "economy", None]
@@ -61,16 +71,83 @@ class Dataset(Base):
     retrieval_model = db.Column(JSONB, nullable=True)
     built_in_field_enabled = db.Column(db.Boolean, nullable=False, server_default=db.text("false"))
 
+    # (raw index_struct, parsed dict) of the last decode, reused while the column is unchanged
+    _index_struct_cache = None
+
     @property
     def index_struct_dict(self):
-        return json.loads(self.index_struct) if self.index_struct else None
+        if not self.index_struct:
+            return None
+        if self._index_struct_cache is None or self._index_struct_cache[0] is not self.index_struct:
+            self._index_struct_cache = (self.index_struct, orjson.loads(self.index_struct))
+        return self._index_struct_cache[1]
 
     @staticmethod
+    @functools.lru_cache(maxsize=4096)
     def gen_collection_name_by_id(dataset_id: str) -> str:
         normalized_dataset_id = dataset_id.replace("-", "_")
         return f"Vector_index_{normalized_dataset_id}_Node"
 
 
+# (name, type) of each built-in metadata field, in the order get_built_in_fields reports them
+_BUILT_IN_FIELD_TEMPLATES = (
+    (BuiltInField.document_name, "string"),
+    (BuiltInField.uploader, "string"),
+    (BuiltInField.upload_date, "time"),
+    (BuiltInField.last_update_date, "time"),
+    (BuiltInField.source, "string"),
+)
+_DATA_SOURCE_VALUES = {source.name: source.value for source in MetadataDataSource}
+# columns Document.to_dict copies verbatim and Document.from_dict reads back, read in one attrgetter call
+_DOCUMENT_DICT_COLUMNS = (
+    "id",
+    "tenant_id",
+    "dataset_id",
+    "position",
+    "data_source_type",
+    "data_source_info",
+    "dataset_process_rule_id",
+    "batch",
+    "name",
+    "created_from",
+    "created_by",
+    "created_api_request_id",
+    "created_at",
+    "processing_started_at",
+    "file_id",
+    "word_count",
+    "parsing_completed_at",
+    "cleaning_completed_at",
+    "splitting_completed_at",
+    "tokens",
+    "indexing_latency",
+    "completed_at",
+    "is_paused",
+    "paused_by",
+    "paused_at",
+    "error",
+    "stopped_at",
+    "indexing_status",
+    "enabled",
+    "disabled_at",
+    "disabled_by",
+    "archived",
+    "archived_reason",
+    "archived_by",
+    "archived_at",
+    "updated_at",
+    "doc_type",
+    "doc_metadata",
+    "doc_form",
+    "doc_language",
+)
+_get_document_dict_columns = operator.attrgetter(*_DOCUMENT_DICT_COLUMNS)
+# Document.to_dict fields that cost extra queries, serialized only when requested
+DOCUMENT_DETAIL_FIELDS = frozenset(
+    {"average_segment_length", "dataset_process_rule", "dataset", "segment_count", "hit_count"}
+)
+
+
 class Document(Base):
     __tablename__ = "documents"
     __table_args__ = (
@@ -78,7 +155,20 @@ class Document(Base):
         db.Index("document_dataset_id_idx", "dataset_id"),
         db.Index("document_is_paused_idx", "is_paused"),
         db.Index("document_tenant_idx", "tenant_id"),
-        db.Index("document_metadata_idx", "doc_metadata", postgresql_using="gin"),
+        # the documents retrieval may search: completed, enabled and not archived, looked up per dataset
+        db.Index(
+            "document_available_idx",
+            "dataset_id",
+            postgresql_include=["id"],
+            postgresql_where=db.text("indexing_status = 'completed' AND enabled AND NOT archived"),
+        ),
+        # jsonb_path_ops only serves @> containment (and jsonpath), at a fraction of the default opclass size
+        db.Index(
+            "document_metadata_idx",
+            "doc_metadata",
+            postgresql_using="gin",
+            postgresql_ops={"doc_metadata": "jsonb_path_ops"},
+        ),
     )
 
     # initial fields
@@ -141,7 +231,25 @@ class Document(Base):
 
     DATA_SOURCES = ["upload_file", "notion_import", "website_crawl"]
 
-    @property
+    # (segment_count, hit_count) bound by load_segment_stats; while unset both properties query on access
+    _segment_stats = None
+
+    # many-to-one lookups resolve from the identity map when the target is already loaded, and list queries
+    # can batch them with selectinload()/joinedload() instead of one SELECT per row
+    dataset = relationship("Dataset", primaryjoin="foreign(Document.dataset_id) == Dataset.id", viewonly=True)
+    uploader_account = relationship(Account, primaryjoin="foreign(Document.created_by) == Account.id", viewonly=True)
+
+    @classmethod
+    def where_metadata_eq(cls, field: str, value: Any):
+        """Equality on one doc_metadata key written as @> containment, so document_metadata_idx can serve it.
+        Only containment is indexed: range and LIKE filters on doc_metadata still scan."""
+        return cls.where_metadata_contains({field: value})
+
+    @classmethod
+    def where_metadata_contains(cls, subset: dict[str, Any]):
+        return cls.doc_metadata.op("@>")(sqlalchemy_cast(subset, JSONB))
+
+    @hybrid_property
     def display_status(self):
         status = None
         if self.indexing_status == "waiting":
@@ -160,22 +268,42 @@ class Document(Base):
             status = "archived"
         return status
 
+    @display_status.inplace.expression
+    @classmethod
+    def _display_status_expression(cls):
+        # same cascade as the Python side, so lists can filter on display_status in SQL
+        completed = cls.indexing_status == "completed"
+        return case(
+            (cls.indexing_status == "waiting", "queuing"),
+            (and_(cls.indexing_status.notin_(("completed", "error", "waiting")), cls.is_paused.is_(True)), "paused"),
+            (cls.indexing_status.in_(("parsing", "cleaning", "splitting", "indexing")), "indexing"),
+            (cls.indexing_status == "error", "error"),
+            (and_(completed, cls.archived.is_(False), cls.enabled.is_(True)), "available"),
+            (and_(completed, cls.archived.is_(False), cls.enabled.is_(False)), "disabled"),
+            (and_(completed, cls.archived.is_(True)), "archived"),
+        )
+
+    # (raw data_source_info, parsed dict) of the last decode, reused while the column is unchanged
+    _data_source_info_cache = None
+
     @property
     def data_source_info_dict(self):
         if self.data_source_info:
-            try:
-                data_source_info_dict = json.loads(self.data_source_info)
-            except JSONDecodeError:
-                data_source_info_dict = {}
-
-            return data_source_info_dict
+            if self._data_source_info_cache is None or self._data_source_info_cache[0] is not self.data_source_info:
+                try:
+                    data_source_info_dict = orjson.loads(self.data_source_info)
+                except orjson.JSONDecodeError:
+                    data_source_info_dict = {}
+                self._data_source_info_cache = (self.data_source_info, data_source_info_dict)
+
+            return self._data_source_info_cache[1]
         return None
 
     @property
     def data_source_detail_dict(self):
         if self.data_source_info:
             if self.data_source_type == "upload_file":
-                data_source_info_dict = json.loads(self.data_source_info)
+                data_source_info_dict = orjson.loads(self.data_source_info)
                 file_detail = (
                     db.session.query(UploadFile)
                     .filter(UploadFile.id == data_source_info_dict["upload_file_id"])
@@ -194,25 +322,26 @@ class Document(Base):
                         }
                     }
             elif self.data_source_type in {"notion_import", "website_crawl"}:
-                return json.loads(self.data_source_info)
+                return orjson.loads(self.data_source_info)
         return {}
 
     @property
     def average_segment_length(self):
-        if self.word_count and self.word_count != 0 and self.segment_count and self.segment_count != 0:
-            return self.word_count // self.segment_count
+        segment_count = self.segment_count
+        if self.word_count and segment_count:
+            return self.word_count // segment_count
         return 0
 
-    @property
-    def dataset(self):
-        return db.session.query(Dataset).filter(Dataset.id == self.dataset_id).one_or_none()
-
     @property
     def segment_count(self):
+        if self._segment_stats is not None:
+            return self._segment_stats[0]
         return db.session.query(DocumentSegment).filter(DocumentSegment.document_id == self.id).count()
 
     @property
     def hit_count(self):
+        if self._segment_stats is not None:
+            return self._segment_stats[1]
         return (
             db.session.query(DocumentSegment)
             .with_entities(func.coalesce(func.sum(DocumentSegment.hit_count)))
@@ -220,9 +349,25 @@ class Document(Base):
             .scalar()
         )
 
+    @classmethod
+    def load_segment_stats(cls, documents: list["Document"]):
+        """Fetch segment_count and hit_count of all documents in one grouped query and bind them to each one."""
+        if not documents:
+            return
+        segment_stats = {
+            document_id: (segment_count, hit_count)
+            for document_id, segment_count, hit_count in db.session.query(
+                DocumentSegment.document_id, func.count(DocumentSegment.id), func.sum(DocumentSegment.hit_count)
+            )
+            .filter(DocumentSegment.document_id.in_({document.id for document in documents}))
+            .group_by(DocumentSegment.document_id)
+        }
+        for document in documents:
+            document._segment_stats = segment_stats.get(document.id, (0, None))
+
     @property
     def uploader(self):
-        user = db.session.query(Account).filter(Account.id == self.created_by).first()
+        user = self.uploader_account
         return user.name if user else None
 
     @property
@@ -240,144 +385,70 @@ class Document(Base):
         return None
 
     def get_built_in_fields(self):
-        built_in_fields = []
-        built_in_fields.append(
-            {
-                "id": "built-in",
-                "name": BuiltInField.document_name,
-                "type": "string",
-                "value": self.name,
-            }
-        )
-        built_in_fields.append(
-            {
-                "id": "built-in",
-                "name": BuiltInField.uploader,
-                "type": "string",
-                "value": self.uploader,
-            }
-        )
-        built_in_fields.append(
-            {
-                "id": "built-in",
-                "name": BuiltInField.upload_date,
-                "type": "time",
-                "value": self.created_at.timestamp(),
-            }
-        )
-        built_in_fields.append(
-            {
-                "id": "built-in",
-                "name": BuiltInField.last_update_date,
-                "type": "time",
-                "value": self.updated_at.timestamp(),
-            }
+        values = (
+            self.name,
+            self.uploader,
+            self.created_at.timestamp(),
+            self.updated_at.timestamp(),
+            _DATA_SOURCE_VALUES[self.data_source_type],
         )
-        built_in_fields.append(
-            {
-                "id": "built-in",
-                "name": BuiltInField.source,
-                "type": "string",
-                "value": MetadataDataSource[self.data_source_type].value,
+        return [
+            {"id": "built-in", "name": name, "type": field_type, "value": value}
+            for (name, field_type), value in zip(_BUILT_IN_FIELD_TEMPLATES, values)
+        ]
+
+    def to_dict(self, include: AbstractSet[str] = frozenset()):
+        """
+        Serialize the columns plus display_status and data_source_info_dict.
+        Fields that need their own queries are only added when named in include (see DOCUMENT_DETAIL_FIELDS).
+        """
+        data = dict(zip(_DOCUMENT_DICT_COLUMNS, _get_document_dict_columns(self)))
+        data["display_status"] = self.display_status
+        data["data_source_info_dict"] = self.data_source_info_dict
+        if "average_segment_length" in include:
+            data["average_segment_length"] = self.average_segment_length
+        if "dataset_process_rule" in include:
+            data["dataset_process_rule"] = self.dataset_process_rule.to_dict() if self.dataset_process_rule else None
+        if "dataset" in include:
+            data["dataset"] = self.dataset.to_dict() if self.dataset else None
+        if "segment_count" in include:
+            data["segment_count"] = self.segment_count
+        if "hit_count" in include:
+            data["hit_count"] = self.hit_count
+        return data
+
+    @classmethod
+    def bulk_to_dict(
+        cls, documents: list["Document"], include: AbstractSet[str] = DOCUMENT_DETAIL_FIELDS
+    ) -> list[dict]:
+        """Serialize documents, loading the included segment stats and datasets with one query each for the batch."""
+        if not documents:
+            return []
+        if include & {"average_segment_length", "segment_count", "hit_count"}:
+            cls.load_segment_stats(documents)
+        if "dataset" in include:
+            datasets = {
+                dataset.id: dataset
+                for dataset in db.session.query(Dataset).filter(
+                    Dataset.id.in_({document.dataset_id for document in documents})
+                )
             }
-        )
-        return built_in_fields
-
-    def to_dict(self):
-        return {
-            "id": self.id,
-            "tenant_id": self.tenant_id,
-            "dataset_id": self.dataset_id,
-            "position": self.position,
-            "data_source_type": self.data_source_type,
-            "data_source_info": self.data_source_info,
-            "dataset_process_rule_id": self.dataset_process_rule_id,
-            "batch": self.batch,
-            "name": self.name,
-            "created_from": self.created_from,
-            "created_by": self.created_by,
-            "created_api_request_id": self.created_api_request_id,
-            "created_at": self.created_at,
-            "processing_started_at": self.processing_started_at,
-            "file_id": self.file_id,
-            "word_count": self.word_count,
-            "parsing_completed_at": self.parsing_completed_at,
-            "cleaning_completed_at": self.cleaning_completed_at,
-            "splitting_completed_at": self.splitting_completed_at,
-            "tokens": self.tokens,
-            "indexing_latency": self.indexing_latency,
-            "completed_at": self.completed_at,
-            "is_paused": self.is_paused,
-            "paused_by": self.paused_by,
-            "paused_at": self.paused_at,
-            "error": self.error,
-            "stopped_at": self.stopped_at,
-            "indexing_status": self.indexing_status,
-            "enabled": self.enabled,
-            "disabled_at": self.disabled_at,
-            "disabled_by": self.disabled_by,
-            "archived": self.archived,
-            "archived_reason": self.archived_reason,
-            "archived_by": self.archived_by,
-            "archived_at": self.archived_at,
-            "updated_at": self.updated_at,
-            "doc_type": self.doc_type,
-            "doc_metadata": self.doc_metadata,
-            "doc_form": self.doc_form,
-            "doc_language": self.doc_language,
-            "display_status": self.display_status,
-            "data_source_info_dict": self.data_source_info_dict,
-            "average_segment_length": self.average_segment_length,
-            "dataset_process_rule": self.dataset_process_rule.to_dict() if self.dataset_process_rule else None,
-            "dataset": self.dataset.to_dict() if self.dataset else None,
-            "segment_count": self.segment_count,
-            "hit_count": self.hit_count,
-        }
+            for document in documents:
+                set_committed_value(document, "dataset", datasets.get(document.dataset_id))
+        return [document.to_dict(include) for document in documents]
 
     @classmethod
     def from_dict(cls, data: dict):
-        return cls(
-            id=data.get("id"),
-            tenant_id=data.get("tenant_id"),
-            dataset_id=data.get("dataset_id"),
-            position=data.get("position"),
-            data_source_type=data.get("data_source_type"),
-            data_source_info=data.get("data_source_info"),
-            dataset_process_rule_id=data.get("dataset_process_rule_id"),
-            batch=data.get("batch"),
-            name=data.get("name"),
-            created_from=data.get("created_from"),
-            created_by=data.get("created_by"),
-            created_api_request_id=data.get("created_api_request_id"),
-            created_at=data.get("created_at"),
-            processing_started_at=data.get("processing_started_at"),
-            file_id=data.get("file_id"),
-            word_count=data.get("word_count"),
-            parsing_completed_at=data.get("parsing_completed_at"),
-            cleaning_completed_at=data.get("cleaning_completed_at"),
-            splitting_completed_at=data.get("splitting_completed_at"),
-            tokens=data.get("tokens"),
-            indexing_latency=data.get("indexing_latency"),
-            completed_at=data.get("completed_at"),
-            is_paused=data.get("is_paused"),
-            paused_by=data.get("paused_by"),
-            paused_at=data.get("paused_at"),
-            error=data.get("error"),
-            stopped_at=data.get("stopped_at"),
-            indexing_status=data.get("indexing_status"),
-            enabled=data.get("enabled"),
-            disabled_at=data.get("disabled_at"),
-            disabled_by=data.get("disabled_by"),
-            archived=data.get("archived"),
-            archived_reason=data.get("archived_reason"),
-            archived_by=data.get("archived_by"),
-            archived_at=data.get("archived_at"),
-            updated_at=data.get("updated_at"),
-            doc_type=data.get("doc_type"),
-            doc_metadata=data.get("doc_metadata"),
-            doc_form=data.get("doc_form"),
-            doc_language=data.get("doc_language"),
-        )
+        return cls(**{column: data.get(column) for column in _DOCUMENT_DICT_COLUMNS})
+
+
+_SIGNED_FILE_URL_PATTERN = re.compile(r"/files/([a-f0-9\-]+)/(image-preview|file-preview)")
+
+
+@functools.cache
+def _file_url_signer(secret_key: str) -> hmac.HMAC:
+    # keyed once per secret; callers copy() it, which skips re-deriving the padded key blocks
+    return hmac.new(secret_key.encode(), digestmod=hashlib.sha256)
 
 
 class DocumentSegment(Base):
@@ -386,6 +457,8 @@ class DocumentSegment(Base):
         db.PrimaryKeyConstraint("id", name="document_segment_pkey"),
         db.Index("document_segment_dataset_id_idx", "dataset_id"),
         db.Index("document_segment_document_id_idx", "document_id"),
+        # previous_segment/next_segment probe by (document_id, position)
+        db.Index("document_segment_document_position_idx", "document_id", "position"),
         db.Index("document_segment_tenant_dataset_idx", "dataset_id", "tenant_id"),
         db.Index("document_segment_tenant_document_idx", "document_id", "tenant_id"),
         db.Index("document_segment_node_dataset_idx", "index_node_id", "dataset_id"),
@@ -423,13 +496,10 @@ class DocumentSegment(Base):
     error = db.Column(db.Text, nullable=True)
     stopped_at = db.Column(db.DateTime, nullable=True)
 
-    @property
-    def dataset(self):
-        return db.session.query(Dataset).filter(Dataset.id == self.dataset_id).first()
-
-    @property
-    def document(self):
-        return db.session.query(Document).filter(Document.id == self.document_id).first()
+    dataset = relationship("Dataset", primaryjoin="foreign(DocumentSegment.dataset_id) == Dataset.id", viewonly=True)
+    document = relationship(
+        "Document", primaryjoin="foreign(DocumentSegment.document_id) == Document.id", viewonly=True
+    )
 
     @property
     def previous_segment(self):
@@ -487,48 +557,22 @@ class DocumentSegment(Base):
         return self.get_sign_content()
 
     def get_sign_content(self):
-        signed_urls = []
-        text = self.content
-
-        # For data before v0.10.0
-        pattern = r"/files/([a-f0-9\-]+)/image-preview"
-        matches = re.finditer(pattern, text)
-        for match in matches:
-            upload_file_id = match.group(1)
-            nonce = os.urandom(16).hex()
-            timestamp = str(int(time.time()))
-            data_to_sign = f"image-preview|{upload_file_id}|{timestamp}|{nonce}"
-            secret_key = dify_config.SECRET_KEY.encode() if dify_config.SECRET_KEY else b""
-            sign = hmac.new(secret_key, data_to_sign.encode(), hashlib.sha256).digest()
-            encoded_sign = base64.urlsafe_b64encode(sign).decode()
-
-            params = f"timestamp={timestamp}&nonce={nonce}&sign={encoded_sign}"
-            signed_url = f"{match.group(0)}?{params}"
-            signed_urls.append((match.start(), match.end(), signed_url))
-
-        # For data after v0.10.0
-        pattern = r"/files/([a-f0-9\-]+)/file-preview"
-        matches = re.finditer(pattern, text)
-        for match in matches:
-            upload_file_id = match.group(1)
-            nonce = os.urandom(16).hex()
-            timestamp = str(int(time.time()))
-            data_to_sign = f"file-preview|{upload_file_id}|{timestamp}|{nonce}"
-            secret_key = dify_config.SECRET_KEY.encode() if dify_config.SECRET_KEY else b""
-            sign = hmac.new(secret_key, data_to_sign.encode(), hashlib.sha256).digest()
-            encoded_sign = base64.urlsafe_b64encode(sign).decode()
-
-            params = f"timestamp={timestamp}&nonce={nonce}&sign={encoded_sign}"
-            signed_url = f"{match.group(0)}?{params}"
-            signed_urls.append((match.start(), match.end(), signed_url))
-
-        # Reconstruct the text with signed URLs
-        offset = 0
-        for start, end, signed_url in signed_urls:
-            text = text[: start + offset] + signed_url + text[end + offset :]
-            offset += len(signed_url) - (end - start)
-
-        return text
+        # image-preview links predate v0.10.0, file-preview links come after it; both are signed the same way
+        # every link in one content shares a timestamp
+        timestamp = str(int(time.time()))
+        return _SIGNED_FILE_URL_PATTERN.sub(functools.partial(self._sign_file_url, timestamp=timestamp), self.content)
+
+    @staticmethod
+    def _sign_file_url(match: re.Match, timestamp: str) -> str:
+        upload_file_id, preview_type = match.group(1), match.group(2)
+        nonce = os.urandom(16).hex()
+        data_to_sign = f"{preview_type}|{upload_file_id}|{timestamp}|{nonce}"
+        signer = _file_url_signer(dify_config.SECRET_KEY or "").copy()
+        signer.update(data_to_sign.encode())
+        encoded_sign = base64.urlsafe_b64encode(signer.digest()).decode()
+
+        params = f"timestamp={timestamp}&nonce={nonce}&sign={encoded_sign}"
+        return f"{match.group(0)}?{params}"
 
 
 class ChildChunk(Base):
@@ -561,17 +605,11 @@ class ChildChunk(Base):
     completed_at = db.Column(db.DateTime, nullable=True)
     error = db.Column(db.Text, nullable=True)
 
-    @property
-    def dataset(self):
-        return db.session.query(Dataset).filter(Dataset.id == self.dataset_id).first()
-
-    @property
-    def document(self):
-        return db.session.query(Document).filter(Document.id == self.document_id).first()
-
-    @property
-    def segment(self):
-        return db.session.query(DocumentSegment).filter(DocumentSegment.id == self.segment_id).first()
+    dataset = relationship("Dataset", primaryjoin="foreign(ChildChunk.dataset_id) == Dataset.id", viewonly=True)
+    document = relationship("Document", primaryjoin="foreign(ChildChunk.document_id) == Document.id", viewonly=True)
+    segment = relationship(
+        "DocumentSegment", primaryjoin="foreign(ChildChunk.segment_id) == DocumentSegment.id", viewonly=True
+    )
 
 
 class Embedding(Base):
@@ -591,8 +629,12 @@ class Embedding(Base):
     created_at = db.Column(db.DateTime, nullable=False, server_default=func.current_timestamp())
     provider_name = db.Column(db.String(255), nullable=False, server_default=db.text("''::character varying"))
 
+    @staticmethod
+    def serialize_embedding(embedding_data: list[float]) -> bytes:
+        return pickle.dumps(embedding_data, protocol=pickle.HIGHEST_PROTOCOL)
+
     def set_embedding(self, embedding_data: list[float]):
-        self.embedding = pickle.dumps(embedding_data, protocol=pickle.HIGHEST_PROTOCOL)
+        self.embedding = self.serialize_embedding(embedding_data)
 
     def get_embedding(self) -> list[float]:
         return cast(list[float], pickle.loads(self.embedding))  # noqa: S301
@@ -650,7 +692,8 @@ class DatasetPermission(Base):
     __table_args__ = (
         db.PrimaryKeyConstraint("id", name="dataset_permission_pkey"),
         db.Index("idx_dataset_permissions_dataset_id", "dataset_id"),
-        db.Index("idx_dataset_permissions_account_id", "account_id"),
+        # covers loading every dataset shared with an account without visiting the heap
+        db.Index("idx_dataset_permissions_account_dataset", "account_id", "dataset_id"),
         db.Index("idx_dataset_permissions_tenant_id", "tenant_id"),
     )
 
@@ -4,6 +4,8 @@ import sqlalchemy as sa
 from sqlalchemy import func
 from sqlalchemy.orm import Mapped, mapped_column
 
+from libs.helper import uuidv7
+
 from .base import Base
 from .engine import db
 from .enums import CreatorUserRole
@@ -19,7 +21,7 @@ class ApiToken(Base):
         db.Index("api_token_tenant_idx", "tenant_id", "type"),
     )
 
-    id = db.Column(StringUUID, server_default=db.text("uuid_generate_v4()"))
+    id = db.Column(StringUUID, default=uuidv7, server_default=db.text("gen_random_uuid()"))
     app_id = db.Column(StringUUID, nullable=True)
     tenant_id = db.Column(StringUUID, nullable=True)
     type = db.Column(db.String(16), nullable=False)
@@ -32,10 +34,14 @@ class UploadFile(Base):
     __tablename__ = "upload_files"
     __table_args__ = (
         db.PrimaryKeyConstraint("id", name="upload_file_pkey"),
-        db.Index("upload_file_tenant_idx", "tenant_id"),
+        # serves per-tenant lookups as well as newest-first listings of a tenant's files
+        db.Index("upload_file_tenant_created_idx", "tenant_id", db.text("created_at DESC")),
+        # only the files cleanup sweeps still have to look at
+        db.Index("upload_file_unused_idx", "tenant_id", "created_at", postgresql_where=db.text("used = false")),
     )
 
-    id: Mapped[str] = db.Column(StringUUID, server_default=db.text("uuid_generate_v4()"))
+    # time-ordered ids keep inserts into this append-heavy table at the tail of the primary key index
+    id: Mapped[str] = db.Column(StringUUID, default=uuidv7, server_default=db.text("gen_random_uuid()"))
     tenant_id: Mapped[str] = db.Column(StringUUID, nullable=False)
     storage_type: Mapped[str] = db.Column(db.String(255), nullable=False)
     key: Mapped[str] = db.Column(db.String(255), nullable=False)
@@ -13,10 +13,10 @@ class ProviderType(Enum):
 
     @staticmethod
     def value_of(value):
-        for member in ProviderType:
-            if member.value == value:
-                return member
-        raise ValueError(f"No matching enum found for value '{value}'")
+        try:
+            return ProviderType(value)
+        except ValueError:
+            raise ValueError(f"No matching enum found for value '{value}'") from None
 
 
 class ProviderQuotaType(Enum):
@@ -31,10 +31,10 @@ class ProviderQuotaType(Enum):
 
     @staticmethod
     def value_of(value):
-        for member in ProviderQuotaType:
-            if member.value == value:
-                return member
-        raise ValueError(f"No matching enum found for value '{value}'")
+        try:
+            return ProviderQuotaType(value)
+        except ValueError:
+            raise ValueError(f"No matching enum found for value '{value}'") from None
 
 
 class Provider(Base):
@@ -1,42 +1,73 @@
+import json
 from datetime import UTC, datetime, timedelta
 from typing import cast
 
 from werkzeug.exceptions import Unauthorized
 
 from extensions.ext_database import db
+from extensions.ext_redis import redis_client
 from models.account import (
     Account,
     AccountStatus,
+    Tenant,
     TenantAccountJoin,
+    TenantAccountRole,
 )
 
+# seconds the current tenant and role resolved by load_user are served from Redis; the account row itself is
+# still read on every call so bans take effect at once, while role changes and tenant switches show after this window
+ACCOUNT_CACHE_TTL = 60
+# columns kept in Redis to rebuild the current tenant without touching the database
+TENANT_CACHED_COLUMNS = ("id", "name", "plan", "status", "custom_config")
+
+
+def _account_cache_key(user_id: str) -> str:
+    return f"account_load:{user_id}"
+
 
 class AccountService:
     @staticmethod
     def load_user(user_id: str) -> None | Account:
-        account = db.session.query(Account).filter_by(id=user_id).first()
+        account = db.session.get(Account, user_id)
         if not account:
             return None
 
         if account.status == AccountStatus.BANNED.value:
             raise Unauthorized("Account is banned.")
 
-        current_tenant = db.session.query(TenantAccountJoin).filter_by(account_id=account.id, current=True).first()
-        if current_tenant:
-            account.set_tenant_id(current_tenant.tenant_id)
+        cached = redis_client.get(_account_cache_key(user_id))
+        if cached:
+            data = json.loads(cached)
+            account.role = TenantAccountRole(data["role"])
+            account._current_tenant = Tenant(**data["tenant"])
         else:
-            available_ta = (
+            # the current membership, or the earliest one when none is current
+            tenant_account_join = (
                 db.session.query(TenantAccountJoin)
-                .filter_by(account_id=account.id)
-                .order_by(TenantAccountJoin.id.asc())
+                .filter(TenantAccountJoin.account_id == account.id)
+                .order_by(TenantAccountJoin.current.desc(), TenantAccountJoin.id.asc())
                 .first()
             )
-            if not available_ta:
+            if not tenant_account_join:
                 return None
 
-            account.set_tenant_id(available_ta.tenant_id)
-            available_ta.current = True
-            db.session.commit()
+            account.set_tenant_id(tenant_account_join.tenant_id)
+            if not tenant_account_join.current:
+                tenant_account_join.current = True
+                db.session.commit()
+
+            tenant = account.current_tenant
+            if tenant and account.role:
+                redis_client.setex(
+                    _account_cache_key(user_id),
+                    ACCOUNT_CACHE_TTL,
+                    json.dumps(
+                        {
+                            "tenant": {column: getattr(tenant, column) for column in TENANT_CACHED_COLUMNS},
+                            "role": account.role,
+                        }
+                    ),
+                )
 
         if datetime.now(UTC).replace(tzinfo=None) - account.last_active_at > timedelta(minutes=10):
             account.last_active_at = datetime.now(UTC).replace(tzinfo=None)
@@ -1,8 +1,13 @@
+import hashlib
+import heapq
+import json
 import logging
 import time
+from collections.abc import Callable
 from typing import Any, Optional
 
-from sqlalchemy import Float, and_, or_, text
+from flask import g, has_request_context
+from sqlalchemy import ColumnElement, Float, and_, or_, select
 from sqlalchemy import cast as sqlalchemy_cast
 from werkzeug.exceptions import Forbidden, NotFound
 
@@ -10,14 +15,84 @@ from core.rag.datasource.retrieval_service import RetrievalService
 from core.rag.entities.metadata_entities import Condition
 from core.rag.models.document import Document
 from extensions.ext_database import db
+from extensions.ext_redis import redis_client
 from models.account import TenantAccountRole
 from models.dataset import (
     Dataset,
     DatasetPermission,
     DatasetPermissionEnum,
 )
+from models.dataset import Document as DatasetDocument
 from services.errors.account import NoPermissionError
 
+# Dataset rows, permission grants and metadata filter results are cached briefly; changes become visible
+# within this window
+DATASET_CACHE_TTL = 30
+
+# Columns the retrieval path reads from a dataset, enough to rebuild a transient Dataset from cache
+DATASET_CACHED_COLUMNS = (
+    "id",
+    "tenant_id",
+    "name",
+    "provider",
+    "permission",
+    "indexing_technique",
+    "index_struct",
+    "created_by",
+    "embedding_model",
+    "embedding_model_provider",
+    "collection_binding_id",
+    "retrieval_model",
+    "built_in_field_enabled",
+)
+
+
+def _metadata_text(metadata_name: str) -> ColumnElement:
+    return DatasetDocument.doc_metadata[metadata_name].astext
+
+
+def _metadata_number(metadata_name: str) -> ColumnElement:
+    return sqlalchemy_cast(DatasetDocument.doc_metadata[metadata_name].astext, Float)
+
+
+def _metadata_equal(metadata_name: str, value: Any) -> ColumnElement:
+    if isinstance(value, str):
+        return DatasetDocument.where_metadata_eq(metadata_name, value)
+    return _metadata_number(metadata_name) == value
+
+
+def _metadata_not_equal(metadata_name: str, value: Any) -> ColumnElement:
+    if isinstance(value, str):
+        return DatasetDocument.doc_metadata[metadata_name] != f'"{value}"'
+    return _metadata_number(metadata_name) != value
+
+
+# Builds the SQL filter for one metadata condition, by comparison operator. The expressions bind their values, so
+# they compile to cached statements; with psycopg2 the key still reaches the planner as a literal, so expression
+# and pg_trgm indexes on (doc_metadata ->> 'field') can serve them. autoescape matches % and _ literally. String
+# equality is @> containment, served by document_metadata_idx; numbers go through the float cast like ≠ and the
+# range operators, so a number stored as a string still matches.
+_METADATA_FILTER_BUILDERS: dict[str, Callable[[str, Any], ColumnElement]] = {
+    "contains": lambda name, value: _metadata_text(name).contains(str(value), autoescape=True),
+    "not contains": lambda name, value: ~_metadata_text(name).contains(str(value), autoescape=True),
+    "start with": lambda name, value: _metadata_text(name).startswith(str(value), autoescape=True),
+    "end with": lambda name, value: _metadata_text(name).endswith(str(value), autoescape=True),
+    "=": _metadata_equal,
+    "is": _metadata_equal,
+    "is not": _metadata_not_equal,
+    "≠": _metadata_not_equal,
+    "empty": lambda name, value: DatasetDocument.doc_metadata[name].is_(None),
+    "not empty": lambda name, value: DatasetDocument.doc_metadata[name].isnot(None),
+    "before": lambda name, value: _metadata_number(name) < value,
+    "<": lambda name, value: _metadata_number(name) < value,
+    "after": lambda name, value: _metadata_number(name) > value,
+    ">": lambda name, value: _metadata_number(name) > value,
+    "≤": lambda name, value: _metadata_number(name) <= value,
+    "<=": lambda name, value: _metadata_number(name) <= value,
+    "≥": lambda name, value: _metadata_number(name) >= value,
+    ">=": lambda name, value: _metadata_number(name) >= value,
+}
+
 
 class DatasetService:
 
@@ -30,7 +105,8 @@ class DatasetService:
         retrieval_setting: dict,  # FIXME drop this any
         metadata_condition: dict,
     ) -> list[dict[str, Any]]:
-        start = time.perf_counter()
+        # only time the call when the debug line below will actually be emitted
+        start = time.perf_counter() if logging.getLogger().isEnabledFor(logging.DEBUG) else None
 
         dataset = cls.get_dataset(dataset_id)
         if dataset is None:
@@ -41,184 +117,171 @@ class DatasetService:
         except NoPermissionError as e:
             raise Forbidden(str(e))
 
+        top_k = retrieval_setting.get("top_k", 2)
         all_documents = RetrievalService.retrieve(
             dataset=dataset,
             query=query,
-            top_k=retrieval_setting.get("top_k", 2),
+            top_k=top_k,
             score_threshold=retrieval_setting.get("score_threshold", 0.0),
-            document_ids_filter=cls.get_document_id_filter(dataset.id, metadata_condition),
+            # without conditions there is nothing to resolve, so the query embeds on the search path directly
+            document_ids_filter_loader=(
+                (lambda: cls.get_document_id_filter(dataset.id, metadata_condition)) if metadata_condition else None
+            ),
         )
 
-        end = time.perf_counter()
-        logging.debug(f"Dataset retrieve in {end - start:0.4f} seconds")
+        if start is not None:
+            logging.debug("Dataset retrieve in %0.4f seconds", time.perf_counter() - start)
 
-        return cls.format_retrieve_response(dataset, all_documents)
+        return cls.format_retrieve_response(dataset, all_documents, top_k)
    
     @classmethod
     def get_dataset(cls, dataset_id) -> Optional[Dataset]:
-        dataset: Optional[Dataset] = db.session.query(Dataset).filter_by(id=dataset_id).first()
-        return dataset
+        cache_key = f"dataset:{dataset_id}"
+        cached_dataset = redis_client.get(cache_key)
+        if cached_dataset:
+            return Dataset(**json.loads(cached_dataset))
 
+        # session.get answers from the identity map when the dataset is already loaded in this session
+        dataset: Optional[Dataset] = db.session.get(Dataset, dataset_id)
+        if dataset:
+            redis_client.setex(
+                cache_key,
+                DATASET_CACHE_TTL,
+                json.dumps({column: getattr(dataset, column) for column in DATASET_CACHED_COLUMNS}),
+            )
+        return dataset
 
     @classmethod
-    def format_retrieve_response(cls, dataset: Dataset, documents: list[Document]) -> list[dict[str, Any]]:
+    def format_retrieve_response(
+        cls, dataset: Dataset, documents: list[Document], top_k: Optional[int] = None
+    ) -> list[dict[str, Any]]:
         retrieval_resource_list = []
-        records = RetrievalService.format_retrieval_documents(documents)
-        if records:
-            for record in records:
-                segment = record.segment
-                database_document = record.document
-                if dataset and database_document:
-                    source = {
-                        "metadata": {
-                            "_source": "knowledge",
-                            "dataset_id": dataset.id,
-                            "dataset_name": dataset.name,
-                            "document_id": database_document.id,
-                            "document_name": database_document.name,
-                            "data_source_type": database_document.data_source_type,
-                            "segment_id": segment.id,
-                            "retriever_from": "external",
-                            "segment_hit_count": segment.hit_count,
-                            "segment_word_count": segment.word_count,
-                            "segment_position": segment.position,
-                            "segment_index_node_hash": segment.index_node_hash,
-                            "doc_metadata": database_document.doc_metadata,
-                        },
-                        "title": database_document.name,
-                        "score": record.score or 0.0,
-                    }
-                    if segment.answer:
-                        source["content"] = f"question:{segment.get_sign_content()} \nanswer:{segment.answer}"
-                    else:
-                        source["content"] = segment.get_sign_content()
-                    retrieval_resource_list.append(source)
-        if retrieval_resource_list:
-            retrieval_resource_list = sorted(
-                retrieval_resource_list,
-                key=lambda x: x["score"] if x.get("score") is not None else 0.0,
-                reverse=True,
-            )
-            for position, item in enumerate(retrieval_resource_list, start=1):
-                item["metadata"]["position"] = position
+        # records without a document are skipped lazily, so the ranking below is the only list built from them
+        candidates = (record for record in RetrievalService.format_retrieval_documents(documents) if record.document)
+        # rank the records themselves so response dicts are only built for the top_k that are returned
+        if top_k:
+            records = heapq.nlargest(top_k, candidates, key=lambda record: record.score or 0.0)
+        else:
+            records = sorted(candidates, key=lambda record: record.score or 0.0, reverse=True)
+        for position, record in enumerate(records, start=1):
+            segment = record.segment
+            database_document = record.document
+            source = {
+                "metadata": {
+                    "_source": "knowledge",
+                    "dataset_id": dataset.id,
+                    "dataset_name": dataset.name,
+                    "document_id": database_document.id,
+                    "document_name": database_document.name,
+                    "data_source_type": database_document.data_source_type,
+                    "segment_id": segment.id,
+                    "retriever_from": "external",
+                    "segment_hit_count": segment.hit_count,
+                    "segment_word_count": segment.word_count,
+                    "segment_position": segment.position,
+                    "segment_index_node_hash": segment.index_node_hash,
+                    "doc_metadata": database_document.doc_metadata,
+                    "position": position,
+                },
+                "title": database_document.name,
+                "score": record.score or 0.0,
+            }
+            if segment.answer:
+                source["content"] = f"question:{segment.get_sign_content()} \nanswer:{segment.answer}"
+            else:
+                source["content"] = segment.get_sign_content()
+            retrieval_resource_list.append(source)
         return retrieval_resource_list
 
     @classmethod
-    def get_document_id_filter(cls, dataset_id: str, metadata_condition: dict) -> list[str]:
+    def get_document_id_filter(cls, dataset_id: str, metadata_condition: dict) -> Optional[list[str]]:
         """Get document id filter from metadata condition."""
-        from models.dataset import Document
+        if not metadata_condition:
+            return None
+
+        condition_hash = hashlib.sha256(json.dumps(metadata_condition, sort_keys=True).encode()).hexdigest()
+        cache_key = f"document_id_filter:{dataset_id}:{condition_hash}"
+        cached_document_ids = redis_client.get(cache_key)
+        if cached_document_ids is not None:
+            return json.loads(cached_document_ids)
+
+        document_ids = cls._query_document_id_filter(dataset_id, metadata_condition)
+        redis_client.setex(cache_key, DATASET_CACHE_TTL, json.dumps(document_ids))
+        return document_ids
 
-        document_query = db.session.query(Document).filter(
-            Document.dataset_id == dataset_id,
-            Document.indexing_status == "completed",
-            Document.enabled == True,
-            Document.archived == False,
+    @classmethod
+    def _query_document_id_filter(cls, dataset_id: str, metadata_condition: dict) -> Optional[list[str]]:
+        document_query = db.session.query(DatasetDocument).filter(
+            DatasetDocument.dataset_id == dataset_id,
+            DatasetDocument.indexing_status == "completed",
+            DatasetDocument.enabled == True,
+            DatasetDocument.archived == False,
         )
 
-        filters = []  # type: ignore
-        if metadata_condition:
-            conditions = []
-            if metadata_condition:
-                for sequence, condition in enumerate(metadata_condition):  # type: ignore
-                    metadata_name = condition.name
-                    expected_value = condition.value
-                    conditions.append(
-                        Condition(
-                            name=metadata_name,
-                            comparison_operator=condition.comparison_operator,
-                            value=expected_value,
-                        )
-                    )
-                    filters = cls._process_metadata_filter_func(
-                        sequence,
-                        condition.comparison_operator,
-                        metadata_name,
-                        expected_value,
-                        filters,
-                    )
+        filters: list = []
+        for condition in metadata_condition:  # type: ignore
+            # built only for its validation, which rejects unknown operators and value types
+            Condition(name=condition.name, comparison_operator=condition.comparison_operator, value=condition.value)
+            cls._process_metadata_filter_func(condition.comparison_operator, condition.name, condition.value, filters)
 
         if filters:
-            if metadata_condition and metadata_condition.logical_operator == "and":  # type: ignore
+            if metadata_condition.logical_operator == "and":  # type: ignore
                 document_query = document_query.filter(and_(*filters))
             else:
                 document_query = document_query.filter(or_(*filters))
 
-            documents = document_query.all()
-            return [document.id for document in documents]
+            # only the ids are needed, so don't load and hydrate whole Document rows
+            return [document_id for (document_id,) in document_query.with_entities(DatasetDocument.id)]
         return None
 
     @classmethod
     def _process_metadata_filter_func(
-        cls, sequence: int, condition: str, metadata_name: str, value: Optional[Any], filters: list
-    ):
-        key = f"{metadata_name}_{sequence}"
-        key_value = f"{metadata_name}_{sequence}_value"
-        match condition:
-            case "contains":
-                filters.append(
-                    (text(f"documents.doc_metadata ->> :{key} LIKE :{key_value}")).params(
-                        **{key: metadata_name, key_value: f"%{value}%"}
-                    )
-                )
-            case "not contains":
-                filters.append(
-                    (text(f"documents.doc_metadata ->> :{key} NOT LIKE :{key_value}")).params(
-                        **{key: metadata_name, key_value: f"%{value}%"}
-                    )
-                )
-            case "start with":
-                filters.append(
-                    (text(f"documents.doc_metadata ->> :{key} LIKE :{key_value}")).params(
-                        **{key: metadata_name, key_value: f"{value}%"}
-                    )
-                )
-            case "end with":
-                filters.append(
-                    (text(f"documents.doc_metadata ->> :{key} LIKE :{key_value}")).params(
-                        **{key: metadata_name, key_value: f"%{value}"}
-                    )
-                )
-            case "=" | "is":
-                if isinstance(value, str):
-                    filters.append(Document.doc_metadata[metadata_name] == f'"{value}"')
-                else:
-                    filters.append(sqlalchemy_cast(Document.doc_metadata[metadata_name].astext, Float) == value)
-            case "is not" | "≠":
-                if isinstance(value, str):
-                    filters.append(Document.doc_metadata[metadata_name] != f'"{value}"')
-                else:
-                    filters.append(sqlalchemy_cast(Document.doc_metadata[metadata_name].astext, Float) != value)
-            case "empty":
-                filters.append(Document.doc_metadata[metadata_name].is_(None))
-            case "not empty":
-                filters.append(Document.doc_metadata[metadata_name].isnot(None))
-            case "before" | "<":
-                filters.append(sqlalchemy_cast(Document.doc_metadata[metadata_name].astext, Float) < value)
-            case "after" | ">":
-                filters.append(sqlalchemy_cast(Document.doc_metadata[metadata_name].astext, Float) > value)
-            case "≤" | "<=":
-                filters.append(sqlalchemy_cast(Document.doc_metadata[metadata_name].astext, Float) <= value)
-            case "≥" | ">=":
-                filters.append(sqlalchemy_cast(Document.doc_metadata[metadata_name].astext, Float) >= value)
-            case _:
-                pass
-        return filters
+        cls, condition: str, metadata_name: str, value: Optional[Any], filters: list
+    ) -> None:
+        build_filter = _METADATA_FILTER_BUILDERS.get(condition)
+        if build_filter:
+            filters.append(build_filter(metadata_name, value))
 
     @classmethod
     def check_dataset_permission(cls, dataset, user):
         if dataset.tenant_id != user.current_tenant_id:
-            logging.debug(f"User {user.id} does not have permission to access dataset {dataset.id}")
+            logging.debug("User %s does not have permission to access dataset %s", user.id, dataset.id)
             raise NoPermissionError("You do not have permission to access this dataset.")
         if user.current_role != TenantAccountRole.OWNER:
             if dataset.permission == DatasetPermissionEnum.ONLY_ME and dataset.created_by != user.id:
-                logging.debug(f"User {user.id} does not have permission to access dataset {dataset.id}")
+                logging.debug("User %s does not have permission to access dataset %s", user.id, dataset.id)
                 raise NoPermissionError("You do not have permission to access this dataset.")
             if dataset.permission == DatasetPermissionEnum.PARTIAL_TEAM:
                 # For partial team permission, user needs explicit permission or be the creator
                 if dataset.created_by != user.id:
-                    user_permission = (
-                        db.session.query(DatasetPermission).filter_by(dataset_id=dataset.id, account_id=user.id).first()
-                    )
-                    if not user_permission:
-                        logging.debug(f"User {user.id} does not have permission to access dataset {dataset.id}")
+                    if not cls._has_partial_member_permission(dataset.id, user.id):
+                        logging.debug("User %s does not have permission to access dataset %s", user.id, dataset.id)
                         raise NoPermissionError("You do not have permission to access this dataset.")
+
+    @staticmethod
+    def _has_partial_member_permission(dataset_id: str, account_id: str) -> bool:
+        cache_key = f"dataset_permission:{dataset_id}:{account_id}"
+        if redis_client.get(cache_key):
+            return True
+
+        if dataset_id not in DatasetService._permitted_dataset_ids(account_id):
+            return False
+        # only grants are cached, so a newly added permission is never shadowed by a stale denial
+        redis_client.setex(cache_key, DATASET_CACHE_TTL, 1)
+        return True
+
+    @staticmethod
+    def _permitted_dataset_ids(account_id: str) -> set[str]:
+        """Ids of the datasets explicitly shared with an account, loaded at most once per request."""
+        cache: Optional[dict] = None
+        if has_request_context():
+            cache = g.setdefault("_dataset_permission_cache", {})
+            if account_id in cache:
+                return cache[account_id]
+
+        dataset_ids = set(
+            db.session.scalars(select(DatasetPermission.dataset_id).where(DatasetPermission.account_id == account_id))
+        )
+        if cache is not None:
+            cache[account_id] = dataset_ids
+        return dataset_ids
@@ -0,0 +1,4 @@
+from app import app
+
+# celery workers and beat load `worker.celery`; web workers only import `app:app`
+celery = app.extensions["celery"]